@@ -0,0 +1,147 @@
+import multiprocessing as mp
+import queue
+import random
+import time
+
+import numpy as np
+
+
+def _evaluate(results, make_env, act, episodes, step, seed):
+    # Runs in the forked child, which sees the learner's memory as it was at
+    # the fork, so `act` reads a frozen snapshot of the Q-values. The child
+    # inherits the trainer's pygame state and any viewer process but uses
+    # neither: its env is headless, and multiprocessing ends the child with
+    # os._exit, so pygame's atexit handler and the viewer's cleanup only run
+    # in the trainer
+    random.seed(seed + step)
+    np.random.seed(seed + step)
+    start = time.perf_counter()
+    env = make_env(render_mode=None)
+    rewards, lengths = [], []
+    for _ in range(episodes):
+        obs, _ = env.reset()
+        total_reward, steps = 0.0, 0
+        while True:
+            obs, reward, terminated, truncated, _ = env.step(act(obs))
+            total_reward += float(np.sum(reward))
+            steps += 1
+            if terminated or truncated:
+                break
+        rewards.append(total_reward)
+        lengths.append(steps)
+    env.close()
+    results.put(
+        {
+            "step": step,
+            "mean_reward": float(np.mean(rewards)),
+            "std_reward": float(np.std(rewards)),
+            "mean_steps": float(np.mean(lengths)),
+            "episodes": episodes,
+            "seconds": time.perf_counter() - start,
+        }
+    )
+
+
+class AsyncEvaluator:
+    """Runs greedy evaluation episodes on Q-value snapshots in the background.
+
+    `submit` forks the training process and the child plays `episodes`
+    greedy episodes on a fresh headless env from `make_env`. The fork shares
+    the learner's memory copy-on-write, so taking a snapshot costs the same
+    no matter how large the Q-table is, and the learner only copies the pages
+    it writes to while the child is still running. The learner never waits:
+    finished results are picked up by `poll`, and a snapshot is skipped when
+    `max_pending` evaluations are already running.
+
+    Needs the "fork" start method, so it is not available on Windows.
+    """
+
+    def __init__(self, make_env, episodes=10, max_pending=1, seed=0, on_report=None):
+        """
+        Args:
+            make_env: Callable returning a new env, called in the child
+                with render_mode=None so it never opens a window
+            episodes: Greedy episodes per snapshot
+            max_pending: Evaluations allowed to run at once
+            seed: Base seed, each evaluation seeds `random` and NumPy with
+                seed + its step
+            on_report: Called with each result dict as it is polled
+        """
+        if not self.available():
+            raise RuntimeError("AsyncEvaluator needs the fork start method")
+        self._ctx = mp.get_context("fork")
+        self._results = self._ctx.Queue()
+        self._pending = []
+        self.make_env = make_env
+        self.episodes = episodes
+        self.max_pending = max_pending
+        self.seed = seed
+        self.on_report = on_report
+
+        # Metrics
+        self.results = []
+        self.skipped = 0
+
+    @staticmethod
+    def available():
+        """Whether this platform can fork."""
+        return "fork" in mp.get_all_start_methods()
+
+    def submit(self, act, step):
+        """Evaluate the current Q-values in a forked child.
+
+        Args:
+            act: Greedy policy, observation -> action; it runs in the child
+                and never needs to be pickled
+            step: Training progress the result is tagged with
+
+        Returns:
+            bool: Whether an evaluation was started
+        """
+        self.poll()
+        if len(self._pending) >= self.max_pending:
+            self.skipped += 1
+            return False
+        process = self._ctx.Process(
+            target=_evaluate,
+            args=(self._results, self.make_env, act, self.episodes, step, self.seed),
+            daemon=True,
+        )
+        process.start()
+        self._pending.append(process)
+        return True
+
+    def poll(self):
+        """Collect finished evaluations without blocking.
+
+        Returns:
+            list: Result dicts that arrived since the last poll
+        """
+        new = []
+        while True:
+            try:
+                new.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        for result in new:
+            self.results.append(result)
+            if self.on_report is not None:
+                self.on_report(result)
+
+        running = []
+        for process in self._pending:
+            if process.is_alive():
+                running.append(process)
+            else:
+                process.join()
+        self._pending = running
+        return new
+
+    def close(self):
+        """Wait for running evaluations and collect their results."""
+        while self._pending:
+            # Drain results while waiting so no child blocks on a full pipe
+            self.poll()
+            time.sleep(0.01)
+        self.poll()
+        return self.results
@@ -0,0 +1,130 @@
+import math
+
+import numpy as np
+
+# Policies over more discrete states than this store only the states in the
+# Q-table, as a sorted lookup, instead of a dense action array
+MAX_DENSE_STATES = 2**24
+
+
+class Policy:
+    """Read-only greedy policy compiled from a Q-table.
+
+    Each used observation column is binned with `np.digitize` against its bin
+    edges, and the bin indices address a dense array holding the argmax action
+    of every discrete state, so acting on a whole batch is one vectorized pass.
+    When the state space is too large for a dense array (e.g. windowed danger
+    observations), the flat indices of the states in the Q-table are kept
+    sorted with their actions and looked up with `np.searchsorted`.
+    """
+
+    def __init__(self, obs_dim, columns, edges, offsets, right, actions, keys=None):
+        """
+        Args:
+            obs_dim: Length of the observation vector
+            columns: Observation column used by each discrete state component
+            edges: Bin edges for each column
+            offsets: Value added to each np.digitize index to get the
+                discrete state component the Q-table was keyed on
+            right: np.digitize `right` flag for each column
+            actions: Dense greedy action array of shape
+                [len(e) + 1 for e in edges], or the action of each state in
+                `keys`
+            keys: Sorted flat indices of the known states for a sparse
+                policy, None for a dense one
+        """
+        self.obs_dim = obs_dim
+        self.columns = np.asarray(columns)
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.offsets = np.asarray(offsets)
+        self.right = np.asarray(right, dtype=bool)
+        self.actions = actions
+        self.keys = None if keys is None else np.asarray(keys, dtype=np.int64)
+        self.shape = tuple(len(e) + 1 for e in self.edges)
+
+    @classmethod
+    def from_q_table(cls, q_table, obs_dim, columns, edges, offsets, right):
+        """Compile `q_table` (discrete state tuple -> Q-values) into a policy.
+
+        States missing from the table act like an all-zero row, i.e. action 0.
+        The policy is sparse when there are more than MAX_DENSE_STATES
+        discrete states.
+
+        Raises:
+            ValueError: If the discrete states cannot be numbered in int64
+        """
+        shape = tuple(len(e) + 1 for e in edges)
+        n_states = math.prod(shape)
+        if n_states > np.iinfo(np.int64).max:
+            raise ValueError(
+                f"{n_states} discrete states are too many to index; "
+                "use fewer bins or observation features"
+            )
+
+        states = np.zeros((0, len(shape)), dtype=np.int64)
+        greedy = np.zeros(0, dtype=np.uint8)
+        if q_table:
+            keys = np.array(list(q_table.keys())) - np.asarray(offsets)
+            inside = np.all((keys >= 0) & (keys < shape), axis=1)
+            states = keys[inside]
+            values = np.array(list(q_table.values()))[inside]
+            greedy = np.argmax(values, axis=1).astype(np.uint8)
+
+        if n_states <= MAX_DENSE_STATES:
+            actions = np.zeros(shape, dtype=np.uint8)
+            actions[tuple(states.T)] = greedy
+            return cls(obs_dim, columns, edges, offsets, right, actions)
+
+        flat = np.ravel_multi_index(tuple(states.T), shape)
+        order = np.argsort(flat)
+        return cls(
+            obs_dim, columns, edges, offsets, right, greedy[order], keys=flat[order]
+        )
+
+    def state_index(self, observations):
+        """Flat index into `actions` for each row of `observations`."""
+        observations = np.atleast_2d(observations)
+        bins = [
+            np.digitize(observations[:, column], edges, right=right)
+            for column, edges, right in zip(self.columns, self.edges, self.right)
+        ]
+        return np.ravel_multi_index(bins, self.shape)
+
+    def act(self, observations):
+        """Greedy actions for a batch of observations."""
+        index = self.state_index(observations)
+        if self.keys is None:
+            return self.actions.ravel()[index]
+        if not len(self.keys):
+            return np.zeros(len(index), dtype=np.uint8)
+        position = np.minimum(np.searchsorted(self.keys, index), len(self.keys) - 1)
+        found = self.keys[position] == index
+        return np.where(found, self.actions[position], 0).astype(np.uint8)
+
+    def save(self, path):
+        sparse = {} if self.keys is None else {"keys": self.keys}
+        np.savez_compressed(
+            path,
+            obs_dim=self.obs_dim,
+            columns=self.columns,
+            edges=np.concatenate(self.edges),
+            edge_counts=[len(e) for e in self.edges],
+            offsets=self.offsets,
+            right=self.right,
+            actions=self.actions,
+            **sparse,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            splits = np.cumsum(data["edge_counts"])[:-1]
+            return cls(
+                int(data["obs_dim"]),
+                data["columns"],
+                np.split(data["edges"], splits),
+                data["offsets"],
+                data["right"],
+                data["actions"],
+                data["keys"] if "keys" in data.files else None,
+            )
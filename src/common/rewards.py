@@ -0,0 +1,48 @@
+# Reward terms are functions of a per-step event record, a dict whose fields
+# each game documents next to its terms. Values are scalars for one env or
+# NumPy arrays for a batch, and terms use plain arithmetic so both work
+# without branching.
+
+
+class RewardTerms(dict):
+    """Reward terms of one game by name."""
+
+    def register(self, name):
+        """Decorator registering a reward term under `name`."""
+
+        def register(fn):
+            self[name] = fn
+            return fn
+
+        return register
+
+
+class RewardFunction:
+    """Weighted sum of registered reward terms.
+
+    Each game subclasses this with its own `terms` and `default_weights`.
+    """
+
+    terms = RewardTerms()
+    default_weights = {}
+
+    def __init__(self, weights=None):
+        """
+        Args:
+            weights: Mapping of term name to weight, `default_weights` if None
+        """
+        weights = self.default_weights if weights is None else weights
+        unknown = set(weights) - set(self.terms)
+        if unknown:
+            raise ValueError(f"Unknown reward terms: {sorted(unknown)}")
+        self.weights = dict(weights)
+
+    def breakdown(self, events):
+        """Weighted value of every term, for logging and comparing schemes."""
+        return {
+            name: weight * self.terms[name](events)
+            for name, weight in self.weights.items()
+        }
+
+    def __call__(self, events):
+        return sum(self.breakdown(events).values())
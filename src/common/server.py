@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import multiprocessing as mp
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from common.policy import Policy
+
+# Wire format: a request is a uint32 row count followed by that many float32
+# observation rows; the reply is one uint8 action per row.
+HEADER = struct.Struct("!I")
+
+
+class BatchingServer:
+    """Asyncio server that answers many clients with one policy lookup.
+
+    Requests that arrive while a batch is being served are queued and looked
+    up together on the next pass of the event loop, up to `max_batch`
+    observation rows per lookup (a larger single request is looked up alone).
+    """
+
+    def __init__(self, policy, max_batch=4096):
+        self.policy = policy
+        self.max_batch = max_batch
+        self._pending = []
+        self._wakeup = asyncio.Event()
+
+    async def _handle(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        row_bytes = 4 * self.policy.obs_dim
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                (rows,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+                payload = await reader.readexactly(rows * row_bytes)
+                observations = np.frombuffer(payload, dtype=np.float32).reshape(
+                    rows, self.policy.obs_dim
+                )
+                future = loop.create_future()
+                self._pending.append((observations, future))
+                self._wakeup.set()
+                writer.write((await future).tobytes())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _batcher(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                count, rows = 0, 0
+                for observations, _ in self._pending:
+                    if count and rows + len(observations) > self.max_batch:
+                        break
+                    count += 1
+                    rows += len(observations)
+                batch = self._pending[:count]
+                del self._pending[:count]
+                actions = self.policy.act(np.concatenate([obs for obs, _ in batch]))
+                start = 0
+                for observations, future in batch:
+                    end = start + len(observations)
+                    future.set_result(actions[start:end])
+                    start = end
+
+    async def serve(self, host="127.0.0.1", port=8765, sock=None):
+        """Serve on `host`:`port`, or on an already bound `sock`."""
+        if sock is None:
+            server = await asyncio.start_server(self._handle, host, port)
+        else:
+            server = await asyncio.start_server(self._handle, sock=sock)
+        batcher = asyncio.create_task(self._batcher())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+class PolicyClient:
+    """Blocking client for `BatchingServer`."""
+
+    def __init__(self, obs_dim, host="127.0.0.1", port=8765):
+        self.obs_dim = obs_dim
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def act(self, observations):
+        observations = np.asarray(observations, dtype=np.float32).reshape(
+            -1, self.obs_dim
+        )
+        self.sock.sendall(HEADER.pack(len(observations)) + observations.tobytes())
+        reply = b""
+        while len(reply) < len(observations):
+            chunk = self.sock.recv(len(observations) - len(reply))
+            if not chunk:
+                raise ConnectionError("Policy server closed the connection")
+            reply += chunk
+        return np.frombuffer(reply, dtype=np.uint8)
+
+    def close(self):
+        self.sock.close()
+
+
+def _bench_client(port, obs_dim, requests, seed):
+    rng = np.random.default_rng(seed)
+    client = PolicyClient(obs_dim, port=port)
+    observations = rng.uniform(0, 600, size=(requests, obs_dim)).astype(np.float32)
+    latencies = np.empty(requests)
+    for i, observation in enumerate(observations):
+        start = time.perf_counter()
+        client.act(observation)
+        latencies[i] = time.perf_counter() - start
+    client.close()
+    return latencies
+
+
+def benchmark(policy, clients=8, requests=2000, port=0):
+    """Serve `policy` on localhost and measure per-request latency from clients."""
+    sock = socket.create_server(("127.0.0.1", port))
+    port = sock.getsockname()[1]
+    server = BatchingServer(policy)
+    thread = threading.Thread(
+        target=asyncio.run, args=(server.serve(sock=sock),), daemon=True
+    )
+    thread.start()
+
+    with mp.get_context("spawn").Pool(clients) as pool:
+        latencies = np.concatenate(
+            pool.starmap(
+                _bench_client,
+                [(port, policy.obs_dim, requests, seed) for seed in range(clients)],
+            )
+        )
+    return {
+        "requests": len(latencies),
+        "p50_ms": float(1000 * np.percentile(latencies, 50)),
+        "p99_ms": float(1000 * np.percentile(latencies, 99)),
+    }
+
+
+def main(description="Serve a compiled policy"):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("policy", help="Policy file written by Policy.save")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--bench", type=int, metavar="CLIENTS", help="Run a local latency benchmark"
+    )
+    args = parser.parse_args()
+
+    policy = Policy.load(args.policy)
+    if args.bench:
+        print(benchmark(policy, clients=args.bench))
+    else:
+        print(f"Serving {args.policy} on {args.host}:{args.port}")
+        asyncio.run(BatchingServer(policy).serve(args.host, args.port))
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+class SnapshotSlot:
+    """Single-writer shared-memory slot holding the newest snapshot.
+
+    Uses a sequence counter (odd while a write is in progress) so the writer
+    never waits for the reader; the reader simply skips torn or stale reads.
+    """
+
+    def __init__(self, ctx, capacity, typecode="i"):
+        """
+        Args:
+            ctx: Multiprocessing context the slot is shared through
+            capacity: Number of values in the slot
+            typecode: `array` typecode of the values, e.g. "i" or "d"
+        """
+        self._seq = ctx.RawValue("q", 0)
+        self._raw = ctx.RawArray(typecode, capacity)
+        self._data = None
+
+    def __getstate__(self):
+        return {"_seq": self._seq, "_raw": self._raw, "_data": None}
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = np.ctypeslib.as_array(self._raw)
+        return self._data
+
+    def publish(self, values):
+        self._seq.value += 1
+        self.data[: len(values)] = values
+        self._seq.value += 1
+
+    def read(self, last_seq):
+        """Return (seq, snapshot) if a newer complete snapshot exists, else None."""
+        seq = self._seq.value
+        if seq == last_seq or seq % 2:
+            return None
+        snapshot = self.data.copy()
+        if self._seq.value != seq:
+            return None
+        return seq, snapshot
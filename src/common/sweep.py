@@ -0,0 +1,143 @@
+import argparse
+import csv
+import json
+import math
+import multiprocessing as mp
+import os
+
+import numpy as np
+
+
+def sample_configs(space, n, seed=0):
+    """Draw `n` random configurations from a search space.
+
+    A search space maps each hyperparameter to a list of choices or a
+    (low, high) range that is sampled log-uniformly.
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                config[name] = values[rng.integers(len(values))]
+            else:
+                low, high = values
+                config[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        configs.append(config)
+    return configs
+
+
+def successive_halving(
+    run_trial,
+    configs,
+    min_episodes=50,
+    max_episodes=1000,
+    eta=3,
+    window=50,
+    workers=None,
+    verbose=True,
+):
+    """Train configurations in rungs, keeping the best 1/eta after each one.
+
+    Every surviving configuration continues from where it stopped, with the
+    episode budget multiplied by `eta` per rung up to `max_episodes`.
+
+    Args:
+        run_trial: Picklable (config, state, episodes) -> (state, rewards)
+            that trains a configuration for `episodes` more episodes,
+            starting from the `state` it last returned (None at first)
+        verbose: Print the scores of each rung as it finishes
+
+    Returns:
+        list: One result dict per configuration, best first
+    """
+    results = [
+        {"config": config, "state": None, "episodes": 0, "score": -math.inf}
+        for config in configs
+    ]
+    alive = list(range(len(configs)))
+    budget = min_episodes
+
+    pool = mp.get_context("spawn").Pool(workers)
+    try:
+        while alive:
+            jobs = [
+                (
+                    results[i]["config"],
+                    results[i]["state"],
+                    budget - results[i]["episodes"],
+                )
+                for i in alive
+            ]
+            for i, (state, rewards) in zip(alive, pool.starmap(run_trial, jobs)):
+                results[i]["state"] = state
+                results[i]["episodes"] = budget
+                results[i]["score"] = float(np.mean(rewards[-window:]))
+
+            if verbose:
+                print(
+                    f"Rung {budget} episodes: "
+                    + ", ".join(f"#{i}={results[i]['score']:.2f}" for i in alive)
+                )
+            if budget >= max_episodes:
+                break
+            alive.sort(key=lambda i: results[i]["score"], reverse=True)
+            alive = alive[: max(1, len(alive) // eta)]
+            budget = min(budget * eta, max_episodes)
+    finally:
+        pool.close()
+        pool.join()
+
+    return sorted(results, key=lambda r: (r["episodes"], r["score"]), reverse=True)
+
+
+def write_results(results, path):
+    """Write a ranked CSV of configurations, their budget and final score."""
+    names = list(results[0]["config"])
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", *names, "episodes", "score"])
+        for rank, result in enumerate(results, 1):
+            config = result["config"]
+            writer.writerow(
+                [rank, *(config[n] for n in names), result["episodes"], result["score"]]
+            )
+
+
+def main(run_trial, search_space, description, output):
+    """Command line sweep over `search_space` with `run_trial` (see above)."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--space", help="JSON search space (default: SEARCH_SPACE)")
+    parser.add_argument("--configs", type=int, default=27)
+    parser.add_argument("--min-episodes", type=int, default=50)
+    parser.add_argument("--max-episodes", type=int, default=1000)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=output)
+    args = parser.parse_args()
+
+    space = search_space
+    if args.space:
+        with open(args.space) as f:
+            space = {
+                name: (
+                    values
+                    if isinstance(values, list)
+                    else (values["low"], values["high"])
+                )
+                for name, values in json.load(f).items()
+            }
+
+    results = successive_halving(
+        run_trial,
+        sample_configs(space, args.configs, args.seed),
+        min_episodes=args.min_episodes,
+        max_episodes=args.max_episodes,
+        eta=args.eta,
+        workers=args.workers,
+    )
+    write_results(results, args.output)
+    best = results[0]
+    print(f"Best: {best['config']} (score {best['score']:.2f}), see {args.output}")
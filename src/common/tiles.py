@@ -0,0 +1,104 @@
+import numpy as np
+
+
+class TileCoder:
+    """Hashed tile coding of continuous observation vectors.
+
+    Each of `n_tilings` grids cuts every observation dimension into
+    `tiles_per_dim` tiles and is shifted by a different fraction of a tile
+    along each dimension, so nearby observations share most of their active
+    tiles. The tile coordinates are hashed into `memory_size` slots, which
+    caps memory no matter how fine the tiles are.
+    """
+
+    def __init__(
+        self, low, high, tiles_per_dim=8, n_tilings=8, memory_size=2**18, seed=0
+    ):
+        """
+        Args:
+            low: Lower bound of each observation dimension
+            high: Upper bound of each observation dimension
+            tiles_per_dim: Tiles across each dimension in one tiling, a
+                single count or one per dimension
+            n_tilings: Number of offset tilings (active tiles per observation)
+            memory_size: Number of hash slots
+            seed: Seed for the hash multipliers
+        """
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.tiles_per_dim = np.broadcast_to(
+            np.asarray(tiles_per_dim, dtype=np.float64), self.low.shape
+        )
+        self.n_tilings = n_tilings
+        self.memory_size = memory_size
+
+        # Asymmetric offsets (1, 3, 5, ...) / n_tilings spread the tilings more
+        # evenly than shifting every dimension by the same amount
+        odd = 2 * np.arange(len(self.low)) + 1
+        self.offsets = (np.arange(n_tilings)[:, None] * odd % n_tilings) / n_tilings
+
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 2**62, len(self.low), dtype=np.uint64) | 1
+        self._tiling_keys = rng.integers(1, 2**62, n_tilings, dtype=np.uint64)
+
+    @classmethod
+    def from_space(cls, space, **kwargs):
+        """Tile coder over the bounds of a gymnasium Box or MultiBinary space."""
+        if hasattr(space, "low"):
+            return cls(space.low.ravel(), space.high.ravel(), **kwargs)
+        return cls(np.zeros(space.n), np.ones(space.n), **kwargs)
+
+    def active(self, observations):
+        """Hash slot of every active tile.
+
+        Returns:
+            np.array: Slot indices of shape (batch, n_tilings)
+        """
+        observations = np.atleast_2d(observations)
+        scaled = (observations - self.low) / (self.high - self.low) * self.tiles_per_dim
+        coords = np.floor(scaled[:, None, :] + self.offsets).astype(np.int64)
+        # Multiply-xorshift hash; uint64 arithmetic wraps around by design
+        h = coords.astype(np.uint64) @ self._multipliers + self._tiling_keys
+        h ^= h >> np.uint64(29)
+        return (h % np.uint64(self.memory_size)).astype(np.int64)
+
+
+class TileQ:
+    """Linear action values over hashed tiles, kept in one preallocated array.
+
+    The value of an observation is the sum of the weights of its active
+    tiles, and updates spread the TD error evenly over them.
+    """
+
+    def __init__(self, coder, n_actions):
+        self.coder = coder
+        self.n_actions = n_actions
+        self.weights = np.zeros((coder.memory_size, n_actions), dtype=np.float32)
+
+    def values(self, observations):
+        """Action values for a batch of observations, shape (batch, n_actions)."""
+        return self.weights[self.coder.active(observations)].sum(axis=1)
+
+    def __getitem__(self, observation):
+        """Action values of a single observation, like a Q-table row."""
+        return self.values(observation)[0]
+
+    def update(self, observations, actions, targets, alpha):
+        """Move the values of the taken actions towards `targets`.
+
+        Args:
+            observations: Observation or batch of observations
+            actions: Action taken for each observation
+            targets: TD target for each observation
+            alpha: Learning rate, shared out over the active tiles
+        """
+        tiles = self.coder.active(observations)
+        actions = np.atleast_1d(actions)
+        values = self.weights[tiles, actions[:, None]].sum(axis=1)
+        errors = np.atleast_1d(targets) - values
+        step = (alpha / self.coder.n_tilings) * errors
+        np.add.at(
+            self.weights,
+            (tiles, actions[:, None]),
+            np.broadcast_to(step[:, None], tiles.shape).astype(np.float32),
+        )
@@ -0,0 +1,157 @@
+from collections import deque
+
+import numpy as np
+
+
+class ArrayQTable:
+    """Q-table that maps each state to an id and keeps all rows in one array.
+
+    Behaves like a defaultdict of zero rows: looking up a new state adds it.
+    Indexing returns a view into the array, so `table[state][action] += x`
+    writes through, but a view is only valid until the next new state is
+    added. Vectorized updates go through `q` with ids from `state_id`.
+    """
+
+    def __init__(self, n_actions, capacity=1024):
+        self.n_actions = n_actions
+        self.ids = {}
+        self.q = np.zeros((capacity, n_actions))
+
+    @classmethod
+    def from_dict(cls, table, n_actions):
+        """Copy a dict-like Q-table (state -> Q-values)."""
+        array_table = cls(n_actions, capacity=max(len(table), 1024))
+        for state, values in table.items():
+            array_table[state] = values
+        return array_table
+
+    def state_id(self, state):
+        state_id = self.ids.get(state)
+        if state_id is None:
+            state_id = len(self.ids)
+            if state_id == len(self.q):
+                self.q = np.concatenate([self.q, np.zeros_like(self.q)])
+            self.ids[state] = state_id
+        return state_id
+
+    def __getitem__(self, state):
+        # Look up the id first, adding a state may reallocate self.q
+        state_id = self.state_id(state)
+        return self.q[state_id]
+
+    def __setitem__(self, state, values):
+        state_id = self.state_id(state)
+        self.q[state_id] = values
+
+    def __contains__(self, state):
+        return state in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def keys(self):
+        return self.ids.keys()
+
+    def values(self):
+        # Ids are handed out in insertion order, matching keys()
+        return list(self.q[: len(self.ids)])
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+
+class EligibilityTraces:
+    """Replacing eligibility traces of recently visited (state id, action) pairs.
+
+    Only pairs with a trace of at least `threshold` are kept, packed at the
+    front of preallocated arrays, so decaying and applying the traces costs
+    time proportional to the handful of live entries rather than the table.
+    """
+
+    def __init__(self, threshold=1e-3, capacity=256):
+        self.threshold = threshold
+        self.state_ids = np.empty(capacity, dtype=np.int64)
+        self.actions = np.empty(capacity, dtype=np.int64)
+        self.traces = np.empty(capacity)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def visit(self, state_id, action):
+        """Set the trace of (state_id, action) to 1."""
+        n = self.size
+        match = np.flatnonzero(
+            (self.state_ids[:n] == state_id) & (self.actions[:n] == action)
+        )
+        if len(match):
+            self.traces[match[0]] = 1.0
+            return
+        if n == len(self.traces):
+            for name in ("state_ids", "actions", "traces"):
+                array = getattr(self, name)
+                setattr(self, name, np.concatenate([array, np.empty_like(array)]))
+        self.state_ids[n] = state_id
+        self.actions[n] = action
+        self.traces[n] = 1.0
+        self.size = n + 1
+
+    def update(self, q, step):
+        """Add `step` times each pair's trace to its entry of the array `q`."""
+        n = self.size
+        # Pairs are unique, so plain fancy-index assignment is safe
+        q[self.state_ids[:n], self.actions[:n]] += step * self.traces[:n]
+
+    def decay(self, factor):
+        """Scale every trace by `factor` and drop those below the threshold."""
+        n = self.size
+        self.traces[:n] *= factor
+        keep = self.traces[:n] >= self.threshold
+        if not keep.all():
+            k = int(keep.sum())
+            self.state_ids[:k] = self.state_ids[:n][keep]
+            self.actions[:k] = self.actions[:n][keep]
+            self.traces[:k] = self.traces[:n][keep]
+            self.size = k
+
+    def clear(self):
+        self.size = 0
+
+
+class NStepWindow:
+    """The latest steps of an episode, waiting for their n-step returns."""
+
+    def __init__(self, n, gamma):
+        self.n = n
+        self.gamma = gamma
+        self.steps = deque()
+        self._discounts = gamma ** np.arange(n + 1)
+
+    def append(self, state, action, reward):
+        self.steps.append((state, action, reward))
+
+    def targets(self, bootstrap, flush=False):
+        """Pop the steps whose n-step return is complete.
+
+        Args:
+            bootstrap: Value of the state after the latest step
+            flush: Pop every pending step with a shorter return, at the
+                end of an episode
+
+        Returns:
+            list: (state, action, target) for each popped step
+        """
+        popped = []
+        while self.steps and (flush or len(self.steps) == self.n):
+            k = len(self.steps)
+            rewards = np.array([reward for _, _, reward in self.steps])
+            target = rewards @ self._discounts[:k] + self._discounts[k] * bootstrap
+            state, action, _ = self.steps.popleft()
+            popped.append((state, action, target))
+        return popped
+
+    def clear(self):
+        self.steps.clear()
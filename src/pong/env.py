@@ -3,8 +3,20 @@ import numpy as np
 import pygame
 from typing import Optional
 from game import Player, Ball
+from viewer import Viewer
+from rewards import BUILTIN_TERMS, RewardFunction, player_events
+from trajectory import (
+    advance_tracker,
+    predict_intercept,
+    steps_in_lane,
+    steps_until_wall,
+    sum_abs_linear,
+)
 from constants import WIDTH, HEIGHT, GREEN, WHITE, BLACK, FPS
 
+# Paddle movement for each action: 0=stay, 1=up, 2=down
+Y_FACTORS = {0: 0, 1: -1, 2: 1}
+
 # 🎯 What skill should the agent learn? [How to play the game pong]
 # 👀 What information does the agent need? [ball_pos, ball_velocity, player_pos, opponent_pos]
 # 🎮 What actions can the agent take? [Discrete choices: up, down, stay]
@@ -13,63 +25,142 @@ from constants import WIDTH, HEIGHT, GREEN, WHITE, BLACK, FPS
 
 
 class PongEnv(gym.Env):
-    def __init__(self, render_mode=None, max_steps=1000):
+    def __init__(
+        self,
+        render_mode=None,
+        max_steps=1000,
+        intercept_obs=False,
+        two_player=False,
+        width=WIDTH,
+        height=HEIGHT,
+        paddle_width=10,
+        paddle_height=100,
+        ball_radius=7,
+        reward_fn=None,
+    ):
         super().__init__()
 
         self.render_mode = render_mode
         self.max_steps = max_steps
+        self.intercept_obs = intercept_obs
+        self.two_player = two_player
+        self.width = width
+        self.height = height
         self.current_step = 0
 
+        # Reward computed from each step's event records (see rewards.py)
+        self.reward_fn = reward_fn or RewardFunction()
+
+        # Opponent only moves when the ball is further than this from its center
+        self.opponent_deadband = 10
+
         # Initialize pygame if rendering
         if self.render_mode == "human":
             pygame.init()
             pygame.display.set_caption("Pong - RL Training")
-            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            self.screen = pygame.display.set_mode((width, height))
             self.clock = pygame.time.Clock()
 
         # Initialize game components
         self.player_1 = Player(
-            posx=20, posy=HEIGHT // 2 - 50, width=10, height=100, speed=10, color=GREEN
+            posx=20,
+            posy=height // 2 - paddle_height // 2,
+            width=paddle_width,
+            height=paddle_height,
+            speed=10,
+            color=GREEN,
+            court_height=height,
         )
         self.player_2 = Player(
-            posx=WIDTH - 30,
-            posy=HEIGHT // 2 - 50,
-            width=10,
-            height=100,
+            posx=width - 20 - paddle_width,
+            posy=height // 2 - paddle_height // 2,
+            width=paddle_width,
+            height=paddle_height,
             speed=10,
             color=GREEN,
+            court_height=height,
         )
-        self.ball = Ball(WIDTH // 2, HEIGHT // 2, 7, 7, WHITE)
+        self.ball = Ball(width // 2, height // 2, ball_radius, 7, WHITE, width, height)
+
+        # Separate process that mirrors the game without throttling training
+        if self.render_mode == "viewer":
+            paddles = [
+                (player.rect.x, player.rect.width, player.rect.height)
+                for player in (self.player_1, self.player_2)
+            ]
+            self.viewer = Viewer(
+                width, height, paddles, ball_radius, title="Pong - RL Training"
+            )
 
         # Define observation space: [ball_x, ball_y, ball_vel_x, ball_vel_y, player1_y, player2_y]
+        low = [0, 0, -20, -20, 0, 0]
+        high = [width, height, 20, 20, height - paddle_height, height - paddle_height]
+        if self.intercept_obs:
+            # Predicted ball y at the agent's paddle column
+            low.append(-self.ball.speed)
+            high.append(height + self.ball.speed)
+        if self.two_player:
+            # One row per player, each seen from its own side of the court
+            low, high = [low, low], [high, high]
         self.observation_space = gym.spaces.Box(
-            low=np.array([0, 0, -20, -20, 0, 0], dtype=np.float32),
-            high=np.array(
-                [WIDTH, HEIGHT, 20, 20, HEIGHT - 100, HEIGHT - 100], dtype=np.float32
-            ),
+            low=np.array(low, dtype=np.float32),
+            high=np.array(high, dtype=np.float32),
             dtype=np.float32,
         )
 
         # Define available actions: 0=stay, 1=up, 2=down
-        self.action_space = gym.spaces.Discrete(3)
+        if self.two_player:
+            self.action_space = gym.spaces.MultiDiscrete([3, 3])
+        else:
+            self.action_space = gym.spaces.Discrete(3)
 
     def _get_obs(self):
         """Convert internal state to observation format.
 
         Returns:
-            np.array: Observation with ball and player positions/velocities
+            np.array: Observation with ball and player positions/velocities,
+                stacked with player 2's mirrored observation in two_player
+                mode
         """
-        return np.array(
-            [
-                self.ball.pos.x,
-                self.ball.pos.y,
-                self.ball.direction.x * self.ball.speed,
-                self.ball.direction.y * self.ball.speed,
-                self.player_1.rect.y,
-                self.player_2.rect.y,
-            ],
-            dtype=np.float32,
-        )
+        obs = [
+            self.ball.pos.x,
+            self.ball.pos.y,
+            self.ball.direction.x * self.ball.speed,
+            self.ball.direction.y * self.ball.speed,
+            self.player_1.rect.y,
+            self.player_2.rect.y,
+        ]
+        if self.intercept_obs:
+            obs.append(self.predict_intercept())
+        if self.two_player:
+            return np.array([obs, self._get_mirrored_obs()], dtype=np.float32)
+        return np.array(obs, dtype=np.float32)
+
+    def _get_mirrored_obs(self):
+        """Player 2's observation, flipped left to right.
+
+        The court is mirrored so that player 2 appears on the left, which lets
+        a policy trained as player 1 play either side.
+        """
+        ball = self.ball
+        x = self.width - ball.pos.x
+        vx = -ball.direction.x * ball.speed
+        vy = ball.direction.y * ball.speed
+        obs = [x, ball.pos.y, vx, vy, self.player_2.rect.y, self.player_1.rect.y]
+        if self.intercept_obs:
+            obs.append(
+                predict_intercept(
+                    x,
+                    ball.pos.y,
+                    vx,
+                    vy,
+                    ball.radius,
+                    self.width - self.player_2.rect.left,
+                    self.width - self.player_1.rect.right,
+                    self.height,
+                )
+            )
+        return obs
 
     def _get_info(self):
         """Compute auxiliary information for debugging.
@@ -101,12 +192,12 @@ class PongEnv(gym.Env):
         self.current_step = 0
 
         # Reset game components
-        self.player_1.rect.y = HEIGHT // 2 - 50
-        self.player_2.rect.y = HEIGHT // 2 - 50
+        self.player_1.rect.y = self.height // 2 - self.player_1.rect.height // 2
+        self.player_2.rect.y = self.height // 2 - self.player_2.rect.height // 2
         self.ball.reset()
 
-        # Simple AI for player 2 (opponent)
-        self._simple_ai_enabled = True
+        # Simple AI for player 2 (opponent) unless both paddles are controlled
+        self._simple_ai_enabled = not self.two_player
 
         observation = self._get_obs()
         info = self._get_info()
@@ -117,66 +208,58 @@ class PongEnv(gym.Env):
         """Execute one timestep within the environment.
 
         Args:
-            action: The action to take (0=stay, 1=up, 2=down)
+            action: The action to take (0=stay, 1=up, 2=down), or a pair of
+                actions for player 1 and player 2 in two_player mode
 
         Returns:
-            tuple: (observation, reward, terminated, truncated, info)
+            tuple: (observation, reward, terminated, truncated, info) where
+                observation and reward have one entry per player in
+                two_player mode
         """
         self.current_step += 1
 
-        # Map action to player movement
-        y_factor = 0
-        if action == 1:  # Up
-            y_factor = -1
-        elif action == 2:  # Down
-            y_factor = 1
-        # action == 0 means stay (y_factor = 0)
+        if self.two_player:
+            action, opponent_action = action
+            self.player_2.update(Y_FACTORS[opponent_action])
 
         # Update player 1 (agent) position
-        self.player_1.update(y_factor)
+        self.player_1.update(Y_FACTORS[action])
 
         # Simple AI for player 2 (opponent) - follows ball
         if self._simple_ai_enabled:
             ball_center_y = self.ball.pos.y
             player2_center_y = self.player_2.rect.y + self.player_2.rect.height // 2
 
-            if ball_center_y < player2_center_y - 10:
+            if ball_center_y < player2_center_y - self.opponent_deadband:
                 self.player_2.update(-1)
-            elif ball_center_y > player2_center_y + 10:
+            elif ball_center_y > player2_center_y + self.opponent_deadband:
                 self.player_2.update(1)
 
         # Update ball position
         point_scored = self.ball.update()
 
-        # Check for paddle collisions
-        if self.ball.get_rect().colliderect(
-            self.player_1.rect
-        ) or self.ball.get_rect().colliderect(self.player_2.rect):
+        # Check for paddle collisions, once for both bouncing and rewards
+        ball_rect = self.ball.collision_rect()
+        hit_1 = ball_rect.colliderect(self.player_1.rect)
+        hit_2 = ball_rect.colliderect(self.player_2.rect)
+        if hit_1 or hit_2:
             self.ball.hit()
 
-        # Calculate reward
-        reward = 0
-        terminated = False
-
-        if point_scored == 1:  # Player 1 (agent) scored
-            reward = 10
-            terminated = True
-        elif point_scored == -1:  # Player 2 (opponent) scored
-            reward = -10
-            terminated = True
-        else:
-            # Small reward for hitting the ball
-            if self.ball.get_rect().colliderect(self.player_1.rect):
-                reward = 1
-            # Small penalty for being far from ball
-            distance_penalty = (
-                abs(
-                    self.ball.pos.y
-                    - (self.player_1.rect.y + self.player_1.rect.height // 2)
-                )
-                / HEIGHT
-            )
-            reward -= 0.01 * distance_penalty
+        events, opponent_events = player_events(
+            point_scored,
+            hit_1,
+            hit_2,
+            self.ball.pos.y,
+            self.player_1.rect.y,
+            self.player_2.rect.y,
+            self.player_1.rect.height,
+            self.height,
+        )
+        reward = self.reward_fn(events)
+        terminated = point_scored != 0
+        if self.two_player:
+            # Player 2 is rewarded like player 1, from its own side
+            reward = np.array([reward, self.reward_fn(opponent_events)])
 
         # Check if episode should truncate (max steps reached)
         truncated = self.current_step >= self.max_steps
@@ -190,6 +273,110 @@ class PongEnv(gym.Env):
 
         return observation, reward, terminated, truncated, info
 
+    def predict_intercept(self):
+        """Predict where the ball next reaches the agent's paddle column.
+
+        Returns:
+            float: Ball y at the first step it overlaps the agent's paddle
+                column, assuming the opponent returns the ball
+        """
+        return predict_intercept(
+            self.ball.pos.x,
+            self.ball.pos.y,
+            self.ball.direction.x * self.ball.speed,
+            self.ball.direction.y * self.ball.speed,
+            self.ball.radius,
+            self.player_1.rect.right,
+            self.player_2.rect.left,
+            self.height,
+        )
+
+    def fast_forward(self):
+        """Jump to the step before the ball reaches either paddle column.
+
+        Equivalent to repeatedly calling `step(0)` while the ball is in open
+        court: the ball, wall bounces, the scripted opponent and the distance
+        penalty are advanced in closed form rather than one step at a time.
+        Of the built-in reward terms only "distance" is nonzero in open court.
+        Stops early when `max_steps` is reached.
+
+        Returns:
+            tuple: (observation, reward, terminated, truncated, info) where
+                reward is the summed reward of the skipped steps and
+                info["skipped_steps"] is how many steps were skipped
+
+        Raises:
+            ValueError: In two_player mode, or if `reward_fn` is not a
+                RewardFunction over the built-in terms
+        """
+        if self.two_player:
+            raise ValueError("fast_forward needs the scripted opponent")
+        if not isinstance(self.reward_fn, RewardFunction) or any(
+            self.reward_fn.terms[name] is not BUILTIN_TERMS.get(name)
+            for name in self.reward_fn.weights
+        ):
+            raise ValueError(
+                "fast_forward can only sum the built-in reward terms; "
+                "use step() with custom reward terms"
+            )
+
+        ball = self.ball
+        x, y = ball.pos.x, ball.pos.y
+        vx = ball.direction.x * ball.speed
+        vy = ball.direction.y * ball.speed
+
+        skipped = min(
+            self.max_steps - self.current_step,
+            steps_in_lane(
+                x, vx, ball.radius, self.player_1.rect.right, self.player_2.rect.left
+            ),
+        )
+        skipped = max(0, skipped)
+
+        half_1 = self.player_1.rect.height // 2
+        half_2 = self.player_2.rect.height // 2
+        agent_center = self.player_1.rect.y + half_1
+        opponent_center = self.player_2.rect.y + half_2
+
+        distance_sum = 0.0
+        remaining = skipped
+        while remaining > 0:
+            to_wall = steps_until_wall(y, vy, self.height)
+            run = min(remaining, to_wall)
+            if self._simple_ai_enabled:
+                opponent_center = advance_tracker(
+                    opponent_center,
+                    y,
+                    vy,
+                    run,
+                    self.player_2.speed,
+                    self.opponent_deadband,
+                    half_2,
+                    self.height - self.player_2.rect.height + half_2,
+                )
+            distance_sum += sum_abs_linear(y - agent_center, vy, run)
+            y += run * vy
+            if run == to_wall:
+                vy = -vy
+                ball.direction.y *= -1
+            remaining -= run
+
+        ball.pos.x = x + skipped * vx
+        ball.pos.y = y
+        self.player_2.rect.y = round(opponent_center) - half_2
+        self.current_step += skipped
+
+        # Only the distance term is paid while the ball is in open court
+        weight = self.reward_fn.weights.get("distance", 0.0)
+        reward = weight * (-0.01 * distance_sum / self.height)
+        truncated = self.current_step >= self.max_steps
+
+        observation = self._get_obs()
+        info = self._get_info()
+        info["skipped_steps"] = skipped
+
+        return observation, reward, False, truncated, info
+
     def render(self):
         """Render the environment."""
         if self.render_mode == "human":
@@ -203,14 +390,22 @@ class PongEnv(gym.Env):
 
             # Draw center line
             pygame.draw.line(
-                self.screen, WHITE, (WIDTH // 2, 0), (WIDTH // 2, HEIGHT), 2
+                self.screen,
+                WHITE,
+                (self.width // 2, 0),
+                (self.width // 2, self.height),
+                2,
             )
 
             # Update display
             pygame.display.flip()
             self.clock.tick(FPS)
+        elif self.render_mode == "viewer":
+            self.viewer.publish(self.ball, self.player_1, self.player_2)
 
     def close(self):
         """Clean up resources."""
         if self.render_mode == "human":
             pygame.quit()
+        elif self.render_mode == "viewer":
+            self.viewer.close()
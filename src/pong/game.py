@@ -1,19 +1,27 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
 import pygame
 from constants import HEIGHT, WIDTH, FONT, GREEN, WHITE, BLACK, FPS
 
 
 class Player:
-    def __init__(self, posx, posy, width, height, speed, color):
+    __slots__ = ("rect", "speed", "color", "court_height")
+
+    def __init__(self, posx, posy, width, height, speed, color, court_height=HEIGHT):
         self.rect = pygame.Rect(posx, posy, width, height)
         self.speed = speed
         self.color = color
+        self.court_height = court_height
 
     def display(self, surface):
         pygame.draw.rect(surface, self.color, self.rect)
 
     def update(self, yFac):
         self.rect.y += self.speed * yFac
-        self.rect.y = max(0, min(self.rect.y, HEIGHT - self.rect.height))
+        self.rect.y = max(0, min(self.rect.y, self.court_height - self.rect.height))
 
     def display_score(self, surface, label, score, x, y, color):
         text = FONT.render(f"{label}{score}", True, color)
@@ -25,13 +33,30 @@ class Player:
 
 
 class Ball:
-    def __init__(self, posx, posy, radius, speed, color):
+    __slots__ = (
+        "court_width",
+        "court_height",
+        "pos",
+        "radius",
+        "speed",
+        "color",
+        "direction",
+        "first_time",
+        "_rect",
+    )
+
+    def __init__(
+        self, posx, posy, radius, speed, color, court_width=WIDTH, court_height=HEIGHT
+    ):
+        self.court_width = court_width
+        self.court_height = court_height
         self.pos = pygame.Vector2(posx, posy)
         self.radius = radius
         self.speed = speed
         self.color = color
         self.direction = pygame.Vector2(1, -1)
         self.first_time = True
+        self._rect = pygame.Rect(0, 0, radius * 2, radius * 2)
 
     def display(self, surface):
         pygame.draw.circle(
@@ -39,21 +64,22 @@ class Ball:
         )
 
     def update(self):
-        self.pos += self.direction * self.speed
+        self.pos.x += self.direction.x * self.speed
+        self.pos.y += self.direction.y * self.speed
 
-        if self.pos.y <= 0 or self.pos.y >= HEIGHT:
+        if self.pos.y <= 0 or self.pos.y >= self.court_height:
             self.direction.y *= -1
 
         if self.pos.x <= 0 and self.first_time:
             self.first_time = False
             return 1
-        elif self.pos.x >= WIDTH and self.first_time:
+        elif self.pos.x >= self.court_width and self.first_time:
             self.first_time = False
             return -1
         return 0
 
     def reset(self):
-        self.pos = pygame.Vector2(WIDTH // 2, HEIGHT // 2)
+        self.pos.update(self.court_width // 2, self.court_height // 2)
         self.direction.x *= -1
         self.first_time = True
 
@@ -68,22 +94,69 @@ class Ball:
             self.radius * 2,
         )
 
+    def collision_rect(self):
+        """Bounding rect of the ball for a collision check.
+
+        Unlike get_rect, the same Rect is updated and returned by every call,
+        so copy it to keep a position.
+        """
+        rect = self._rect
+        rect.x = int(self.pos.x - self.radius)
+        rect.y = int(self.pos.y - self.radius)
+        return rect
+
     def _get_pos(self):
         return self.pos
 
 
 class Game:
-    def __init__(self, player_1=None, player_2=None):
+    __slots__ = (
+        "width",
+        "height",
+        "player_1",
+        "player_2",
+        "ball",
+        "screen",
+        "clock",
+        "scores",
+        "is_running",
+        "y_factors",
+    )
+
+    def __init__(
+        self,
+        player_1=None,
+        player_2=None,
+        width=WIDTH,
+        height=HEIGHT,
+        paddle_width=10,
+        paddle_height=100,
+        ball_radius=7,
+    ):
         pygame.display.set_caption("Pong")
+        self.width = width
+        self.height = height
         self.player_1 = player_1 or Player(
-            posx=20, posy=0, width=10, height=100, speed=10, color=GREEN
+            posx=20,
+            posy=0,
+            width=paddle_width,
+            height=paddle_height,
+            speed=10,
+            color=GREEN,
+            court_height=height,
         )
         self.player_2 = player_2 or Player(
-            posx=WIDTH - 30, posy=0, width=10, height=100, speed=10, color=GREEN
+            posx=width - 20 - paddle_width,
+            posy=0,
+            width=paddle_width,
+            height=paddle_height,
+            speed=10,
+            color=GREEN,
+            court_height=height,
         )
 
-        self.ball = Ball(WIDTH // 2, HEIGHT // 2, 7, 7, WHITE)
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.ball = Ball(width // 2, height // 2, ball_radius, 7, WHITE, width, height)
+        self.screen = pygame.display.set_mode((width, height))
         self.clock = pygame.time.Clock()
         self.scores = [0, 0]
         self.is_running = True
@@ -111,9 +184,8 @@ class Game:
                     self.y_factors[0] = 0
 
     def _detect_collisions(self):
-        if self.ball.get_rect().colliderect(
-            self.player_1.rect
-        ) or self.ball.get_rect().colliderect(self.player_2.rect):
+        rect = self.ball.collision_rect()
+        if rect.colliderect(self.player_1.rect) or rect.colliderect(self.player_2.rect):
             self.ball.hit()
 
     def start(self):
@@ -147,14 +219,70 @@ class Game:
                 self.screen, "Player 1 : ", self.scores[0], 100, 20, WHITE
             )
             self.player_2.display_score(
-                self.screen, "Player 2 : ", self.scores[1], WIDTH - 100, 20, WHITE
+                self.screen, "Player 2 : ", self.scores[1], self.width - 100, 20, WHITE
             )
 
             pygame.display.update()
             self.clock.tick(FPS)
 
 
+def bench(n_games=1000, steps=200):
+    """Measure headless paddles and balls with paddles sweeping up and down.
+
+    Returns:
+        dict: Traced bytes per game, microseconds per game step and garbage
+            collections run while stepping
+    """
+    gc.collect()
+    tracemalloc.start()
+    games = [
+        (
+            Player(20, 0, 10, 100, 10, GREEN),
+            Player(WIDTH - 30, 0, 10, 100, 10, GREEN),
+            Ball(WIDTH // 2, HEIGHT // 2, 7, 7, WHITE),
+        )
+        for _ in range(n_games)
+    ]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    start = time.perf_counter()
+    for step in range(steps):
+        y_factor = step // 30 % 2 * 2 - 1
+        for player_1, player_2, ball in games:
+            player_1.update(y_factor)
+            player_2.update(-y_factor)
+            if ball.update():
+                ball.reset()
+            rect = ball.collision_rect()
+            if rect.colliderect(player_1.rect) or rect.colliderect(player_2.rect):
+                ball.hit()
+    elapsed = time.perf_counter() - start
+    return {
+        "bytes_per_game": memory / n_games,
+        "us_per_step": elapsed / (n_games * steps) * 1e6,
+        "gc_collections": sum(stats["collections"] for stats in gc.get_stats())
+        - collections,
+    }
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Pong")
+    parser.add_argument(
+        "--bench", type=int, metavar="N", help="time N headless games instead"
+    )
+    args = parser.parse_args()
+
+    if args.bench:
+        results = bench(args.bench)
+        print(
+            f"{results['bytes_per_game']:,.0f} bytes per game, "
+            f"{results['us_per_step']:.2f} us per step, "
+            f"{results['gc_collections']} garbage collections"
+        )
+        return
+
     game = Game()
     game.start()
 
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+
+import time
+
+import numpy as np
+
+from constants import WIDTH, HEIGHT
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Batched Pong transition kernels on plain arrays, mirroring PongEnv.step.
+# Paddle positions are the rect tops, the ball position is its center and
+# `first` is Ball.first_time. Player 2 takes the action in `p2_actions`, or
+# tracks the ball like PongEnv's scripted opponent where that is negative.
+PADDLE_SPEED = 10
+BALL_SPEED = 7
+OPPONENT_DEADBAND = 10
+
+
+def make_state(n_envs, width=WIDTH, height=HEIGHT, paddle_height=100):
+    """Batch of freshly reset games."""
+    return {
+        "p1_y": np.full(n_envs, height // 2 - paddle_height // 2, dtype=np.int64),
+        "p2_y": np.full(n_envs, height // 2 - paddle_height // 2, dtype=np.int64),
+        "ball_x": np.full(n_envs, width // 2, dtype=np.float64),
+        "ball_y": np.full(n_envs, height // 2, dtype=np.float64),
+        "dir_x": np.full(n_envs, -1.0),
+        "dir_y": np.full(n_envs, -1.0),
+        "first": np.ones(n_envs, dtype=bool),
+    }
+
+
+def reset(
+    done,
+    p1_y,
+    p2_y,
+    ball_x,
+    ball_y,
+    dir_x,
+    dir_y,
+    first,
+    width=WIDTH,
+    height=HEIGHT,
+    paddle_height=100,
+):
+    """Start new episodes in the games selected by `done`, like PongEnv.reset."""
+    p1_y[done] = height // 2 - paddle_height // 2
+    p2_y[done] = height // 2 - paddle_height // 2
+    ball_x[done] = width // 2
+    ball_y[done] = height // 2
+    dir_x[done] *= -1
+    first[done] = True
+
+
+def _overlaps(ax, ay, size, bx, by, bw, bh):
+    # pygame.Rect.colliderect for the ball's square against a paddle
+    return (ax < bx + bw) & (bx < ax + size) & (ay < by + bh) & (by < ay + size)
+
+
+def step_numpy(
+    actions,
+    p1_y,
+    p2_y,
+    ball_x,
+    ball_y,
+    dir_x,
+    dir_y,
+    first,
+    width=WIDTH,
+    height=HEIGHT,
+    paddle_width=10,
+    paddle_height=100,
+    radius=7,
+    p2_actions=None,
+):
+    """Advance every game one step in place.
+
+    Returns:
+        tuple: (rewards, points, hits) where rewards and hits have a column
+            per player and points is 1 or -1 for the side that scored as
+            returned by Ball.update, and 0 otherwise
+    """
+    if p2_actions is None:
+        p2_actions = np.full(len(actions), -1)
+    p1_x, p2_x = 20, width - 20 - paddle_width
+
+    y_factor = np.where(actions == 1, -1, np.where(actions == 2, 1, 0))
+    p1_y[:] = np.clip(p1_y + PADDLE_SPEED * y_factor, 0, height - paddle_height)
+
+    center = p2_y + paddle_height // 2
+    track = np.where(
+        ball_y < center - OPPONENT_DEADBAND,
+        -1,
+        np.where(ball_y > center + OPPONENT_DEADBAND, 1, 0),
+    )
+    y_factor = np.where(
+        p2_actions < 0,
+        track,
+        np.where(p2_actions == 1, -1, np.where(p2_actions == 2, 1, 0)),
+    )
+    p2_y[:] = np.clip(p2_y + PADDLE_SPEED * y_factor, 0, height - paddle_height)
+
+    ball_x += dir_x * BALL_SPEED
+    ball_y += dir_y * BALL_SPEED
+    dir_y[(ball_y <= 0) | (ball_y >= height)] *= -1
+
+    points = np.zeros(len(actions), dtype=np.int64)
+    points[(ball_x <= 0) & first] = 1
+    points[(ball_x >= width) & first] = -1
+    first[points != 0] = False
+
+    # The ball rect truncates towards zero like int() in Ball.get_rect
+    rect_x = np.trunc(ball_x - radius)
+    rect_y = np.trunc(ball_y - radius)
+    hits_p1 = _overlaps(
+        rect_x, rect_y, 2 * radius, p1_x, p1_y, paddle_width, paddle_height
+    )
+    hits_p2 = _overlaps(
+        rect_x, rect_y, 2 * radius, p2_x, p2_y, paddle_width, paddle_height
+    )
+    dir_x[hits_p1 | hits_p2] *= -1
+
+    rewards = np.empty((len(actions), 2))
+    for player, (y, hits) in enumerate(((p1_y, hits_p1), (p2_y, hits_p2))):
+        distance = np.abs(ball_y - (y + paddle_height // 2)) / height
+        rewards[:, player] = np.where(hits, 1.0, 0.0) - 0.01 * distance
+    rewards[points != 0, 0] = 10.0 * points[points != 0]
+    rewards[points != 0, 1] = -10.0 * points[points != 0]
+
+    scored = points != 0
+    ball_x[scored] = width // 2
+    ball_y[scored] = height // 2
+    dir_x[scored] *= -1
+    first[scored] = True
+    return rewards, points, np.stack([hits_p1, hits_p2], axis=1)
+
+
+def _step_loop(
+    actions,
+    p1_y,
+    p2_y,
+    ball_x,
+    ball_y,
+    dir_x,
+    dir_y,
+    first,
+    width,
+    height,
+    paddle_width,
+    paddle_height,
+    radius,
+    p2_actions,
+):
+    p1_x, p2_x = 20, width - 20 - paddle_width
+    size = 2 * radius
+    rewards = np.zeros((actions.shape[0], 2))
+    points = np.zeros(actions.shape[0], dtype=np.int64)
+    hits = np.zeros((actions.shape[0], 2), dtype=np.bool_)
+    for i in range(actions.shape[0]):
+        if actions[i] == 1:
+            p1_y[i] -= PADDLE_SPEED
+        elif actions[i] == 2:
+            p1_y[i] += PADDLE_SPEED
+        p1_y[i] = max(0, min(p1_y[i], height - paddle_height))
+
+        if p2_actions[i] < 0:
+            center = p2_y[i] + paddle_height // 2
+            if ball_y[i] < center - OPPONENT_DEADBAND:
+                p2_y[i] = max(0, p2_y[i] - PADDLE_SPEED)
+            elif ball_y[i] > center + OPPONENT_DEADBAND:
+                p2_y[i] = min(p2_y[i] + PADDLE_SPEED, height - paddle_height)
+        else:
+            if p2_actions[i] == 1:
+                p2_y[i] -= PADDLE_SPEED
+            elif p2_actions[i] == 2:
+                p2_y[i] += PADDLE_SPEED
+            p2_y[i] = max(0, min(p2_y[i], height - paddle_height))
+
+        ball_x[i] += dir_x[i] * BALL_SPEED
+        ball_y[i] += dir_y[i] * BALL_SPEED
+        if ball_y[i] <= 0 or ball_y[i] >= height:
+            dir_y[i] = -dir_y[i]
+
+        if ball_x[i] <= 0 and first[i]:
+            points[i] = 1
+            first[i] = False
+        elif ball_x[i] >= width and first[i]:
+            points[i] = -1
+            first[i] = False
+
+        rect_x = np.trunc(ball_x[i] - radius)
+        rect_y = np.trunc(ball_y[i] - radius)
+        hit_p1 = (
+            rect_x < p1_x + paddle_width
+            and p1_x < rect_x + size
+            and rect_y < p1_y[i] + paddle_height
+            and p1_y[i] < rect_y + size
+        )
+        hit_p2 = (
+            rect_x < p2_x + paddle_width
+            and p2_x < rect_x + size
+            and rect_y < p2_y[i] + paddle_height
+            and p2_y[i] < rect_y + size
+        )
+        hits[i, 0] = hit_p1
+        hits[i, 1] = hit_p2
+        if hit_p1 or hit_p2:
+            dir_x[i] = -dir_x[i]
+
+        if points[i] != 0:
+            rewards[i, 0] = 10.0 * points[i]
+            rewards[i, 1] = -10.0 * points[i]
+        else:
+            if hit_p1:
+                rewards[i, 0] = 1.0
+            if hit_p2:
+                rewards[i, 1] = 1.0
+            rewards[i, 0] -= (
+                0.01 * abs(ball_y[i] - (p1_y[i] + paddle_height // 2)) / height
+            )
+            rewards[i, 1] -= (
+                0.01 * abs(ball_y[i] - (p2_y[i] + paddle_height // 2)) / height
+            )
+
+        if points[i] != 0:
+            ball_x[i] = width // 2
+            ball_y[i] = height // 2
+            dir_x[i] = -dir_x[i]
+            first[i] = True
+    return rewards, points, hits
+
+
+if njit is not None:
+    _step_jit = njit(cache=True)(_step_loop)
+
+    def step_numba(
+        actions,
+        p1_y,
+        p2_y,
+        ball_x,
+        ball_y,
+        dir_x,
+        dir_y,
+        first,
+        width=WIDTH,
+        height=HEIGHT,
+        paddle_width=10,
+        paddle_height=100,
+        radius=7,
+        p2_actions=None,
+    ):
+        # Omitted defaults send Numba's dispatcher down a much slower path
+        if p2_actions is None:
+            p2_actions = np.full(len(actions), -1)
+        return _step_jit(
+            actions,
+            p1_y,
+            p2_y,
+            ball_x,
+            ball_y,
+            dir_x,
+            dir_y,
+            first,
+            width,
+            height,
+            paddle_width,
+            paddle_height,
+            radius,
+            p2_actions,
+        )
+
+else:
+    step_numba = None
+
+# Fastest available backend
+step = step_numba if step_numba is not None else step_numpy
+
+
+def check_parity(n_envs=64, n_steps=2000, seed=0):
+    """Run both backends from the same seed and check the trajectories match."""
+    if step_numba is None:
+        raise RuntimeError("Numba is not installed")
+    states = [make_state(n_envs), make_state(n_envs)]
+    rng = np.random.default_rng(seed)
+    for _ in range(n_steps):
+        actions = rng.integers(0, 3, n_envs)
+        # Half the games have a scripted opponent
+        p2_actions = np.where(np.arange(n_envs) % 2, rng.integers(0, 3, n_envs), -1)
+        results = [
+            backend(actions, **s, p2_actions=p2_actions)
+            for backend, s in zip((step_numpy, step_numba), states)
+        ]
+        assert np.array_equal(results[0][1], results[1][1]), "points differ"
+        assert np.array_equal(results[0][2], results[1][2]), "hits differ"
+        assert np.allclose(results[0][0], results[1][0]), "rewards differ"
+        for key in states[0]:
+            assert np.array_equal(states[0][key], states[1][key]), f"{key} differs"
+
+
+def main():
+    rng = np.random.default_rng(0)
+    backends = [("numpy", step_numpy)]
+    if step_numba is not None:
+        check_parity()
+        print("Parity check passed")
+        backends.append(("numba", step_numba))
+
+    for name, backend in backends:
+        state = make_state(1024)
+        actions = rng.integers(0, 3, 1024)
+        start = time.perf_counter()
+        for _ in range(200):
+            backend(actions, **state)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {1024 * 200 / elapsed:,.0f} env steps/s")
+
+
+if __name__ == "__main__":
+    main()
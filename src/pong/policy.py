@@ -0,0 +1,31 @@
+import numpy as np
+
+import paths  # noqa: F401
+from common.policy import Policy as BasePolicy
+
+
+class Policy(BasePolicy):
+    """Greedy policy compiled from a trained `SimpleQAgent`."""
+
+    @classmethod
+    def from_agent(cls, agent, env, bin_size=50):
+        """Compile a trained `SimpleQAgent` for observations from `env`."""
+
+        # SimpleQAgent bins with `// bin_size`, which is np.digitize against
+        # multiples of bin_size shifted by one to cover the first negative bin
+        def floor_edges(high):
+            return np.arange(0, high + bin_size + 1, bin_size)
+
+        return cls.from_q_table(
+            agent.q_table,
+            obs_dim=env.observation_space.shape[0],
+            columns=[0, 1, 2, 4],
+            edges=[
+                floor_edges(env.width),
+                floor_edges(env.height),
+                [0],
+                floor_edges(env.height - env.player_1.rect.height),
+            ],
+            offsets=[-1, -1, 0, -1],
+            right=[False, False, True, False],
+        )
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+
+import numpy as np
+
+import kernels
+from env import PongEnv
+from policy import Policy
+from rewards import player_events
+from train import SimpleQAgent
+
+
+def observations(state, width):
+    """PongEnv observations of both players for a batch of kernel games.
+
+    Returns:
+        tuple: (player 1 observations, player 2 observations mirrored like
+            PongEnv._get_mirrored_obs)
+    """
+    vx = state["dir_x"] * kernels.BALL_SPEED
+    vy = state["dir_y"] * kernels.BALL_SPEED
+    obs_1 = np.stack(
+        [state["ball_x"], state["ball_y"], vx, vy, state["p1_y"], state["p2_y"]],
+        axis=1,
+    )
+    obs_2 = np.stack(
+        [
+            width - state["ball_x"],
+            state["ball_y"],
+            -vx,
+            vy,
+            state["p2_y"],
+            state["p1_y"],
+        ],
+        axis=1,
+    )
+    return obs_1.astype(np.float32), obs_2.astype(np.float32)
+
+
+def batch_update(q, states, actions, td_targets, learning_rate):
+    """Q-learning update of `q` in place from a batch of transitions.
+
+    Games that share a (state, action) pair move it once, towards the mean
+    of their TD targets, so a batch of identical games updates `q` exactly
+    like a single game would.
+    """
+    pairs, index, counts = np.unique(
+        states * q.shape[1] + actions, return_inverse=True, return_counts=True
+    )
+    errors = np.bincount(index, td_targets - q[states, actions]) / counts
+    q.reshape(-1)[pairs] += learning_rate * errors
+
+
+class League:
+    """Frozen past policies that the learner is matched against.
+
+    Every snapshot is a compiled greedy `Policy` (one uint8 action per
+    discrete state), and the scripted tracking opponent can be kept as an
+    extra member so the learner does not forget how to beat it.
+    """
+
+    def __init__(self, capacity=16, scripted=True):
+        self.capacity = capacity
+        self.scripted = scripted
+        self.policies = []
+
+    def __len__(self):
+        return len(self.policies) + self.scripted
+
+    def add(self, policy):
+        """Add a snapshot, dropping the oldest one when the league is full."""
+        self.policies.append(policy)
+        if len(self.policies) > self.capacity:
+            self.policies.pop(0)
+
+    def sample(self, rng, n):
+        """Pick an opponent index for each of `n` episodes."""
+        return rng.integers(len(self), size=n)
+
+    def act(self, opponents, observations):
+        """Actions of each game's opponent, -1 for the scripted opponent."""
+        actions = np.full(len(opponents), -1, dtype=np.int64)
+        for k in np.unique(opponents):
+            if k < len(self.policies):
+                games = opponents == k
+                actions[games] = self.policies[k].act(observations[games])
+        return actions
+
+    def save(self, path):
+        """Write all snapshots to one file; they share a state layout."""
+        layout = self.policies[0]
+        np.savez_compressed(
+            path,
+            obs_dim=layout.obs_dim,
+            columns=layout.columns,
+            edges=np.concatenate(layout.edges),
+            edge_counts=[len(e) for e in layout.edges],
+            offsets=layout.offsets,
+            right=layout.right,
+            actions=np.stack([policy.actions for policy in self.policies]),
+            scripted=self.scripted,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            splits = np.cumsum(data["edge_counts"])[:-1]
+            edges = np.split(data["edges"], splits)
+            league = cls(len(data["actions"]), bool(data["scripted"]))
+            for actions in data["actions"]:
+                league.add(
+                    Policy(
+                        int(data["obs_dim"]),
+                        data["columns"],
+                        edges,
+                        data["offsets"],
+                        data["right"],
+                        actions,
+                    )
+                )
+        return league
+
+
+def train(
+    n_envs=256,
+    steps=20_000,
+    learning_rate=0.1,
+    discount=0.95,
+    epsilon=0.1,
+    epsilon_decay=0.995,
+    epsilon_min=0.01,
+    snapshot_interval=1000,
+    league=None,
+    max_steps=1000,
+    seed=0,
+    reward_fn=None,
+    verbose=True,
+):
+    """Self-play Q-learning on batched kernel games against a league.
+
+    The learner plays player 1 in `n_envs` games at once with the same
+    discretization and update rule as SimpleQAgent, kept in a dense table.
+    Each game's opponent is sampled from the league when its episode starts,
+    and the learner's greedy policy joins the league every
+    `snapshot_interval` steps.
+
+    Exploration follows `train_agent`'s schedule: epsilon is multiplied by
+    `epsilon_decay` for every finished episode, down to `epsilon_min`.
+
+    Rewards come from the kernel, which computes PongEnv's default reward,
+    unless `reward_fn` is given; it is then evaluated once per step on the
+    whole batch's event records.
+
+    Returns:
+        tuple: (learner Policy, League, player 1's total reward in every
+            finished episode)
+    """
+    rng = np.random.default_rng(seed)
+    env = PongEnv()
+    layout = Policy.from_agent(SimpleQAgent(env.action_space.n), env)
+    q = np.zeros((layout.actions.size, env.action_space.n), dtype=np.float32)
+
+    def snapshot():
+        actions = q.argmax(axis=1).astype(np.uint8).reshape(layout.actions.shape)
+        return Policy(
+            layout.obs_dim,
+            layout.columns,
+            layout.edges,
+            layout.offsets,
+            layout.right,
+            actions,
+        )
+
+    if league is None:
+        league = League()
+    if not league.policies:
+        league.add(snapshot())
+
+    state = kernels.make_state(n_envs, env.width, env.height)
+    opponents = league.sample(rng, n_envs)
+    episode_steps = np.zeros(n_envs, dtype=np.int64)
+    episode_rewards = np.zeros(n_envs)
+    finished = []
+    obs_1, obs_2 = observations(state, env.width)
+    s = layout.state_index(obs_1)
+
+    start = time.perf_counter()
+    for step in range(1, steps + 1):
+        greedy = q[s].argmax(axis=1)
+        explore = rng.random(n_envs) < epsilon
+        actions = np.where(explore, rng.integers(0, 3, n_envs), greedy)
+
+        rewards, points, hits = kernels.step(
+            actions,
+            **state,
+            width=env.width,
+            height=env.height,
+            p2_actions=league.act(opponents, obs_2),
+        )
+        if reward_fn is not None:
+            # Scored games are already re-served, so ball_y is the new serve
+            events, _ = player_events(
+                points,
+                hits[:, 0],
+                hits[:, 1],
+                state["ball_y"],
+                state["p1_y"],
+                state["p2_y"],
+                env.player_1.rect.height,
+                env.height,
+            )
+            rewards[:, 0] = reward_fn(events)
+        obs_1, obs_2 = observations(state, env.width)
+        s_next = layout.state_index(obs_1)
+
+        # SimpleQAgent.update for every game at once
+        td_target = rewards[:, 0] + discount * q[s_next].max(axis=1)
+        batch_update(q, s, actions, td_target, learning_rate)
+
+        episode_steps += 1
+        episode_rewards += rewards[:, 0]
+        done = (points != 0) | (episode_steps >= max_steps)
+        if done.any():
+            finished.extend(episode_rewards[done].tolist())
+            epsilon = max(epsilon * epsilon_decay ** int(done.sum()), epsilon_min)
+            kernels.reset(done, **state, width=env.width, height=env.height)
+            opponents[done] = league.sample(rng, int(done.sum()))
+            episode_steps[done] = 0
+            episode_rewards[done] = 0
+            obs_1, obs_2 = observations(state, env.width)
+            s_next = layout.state_index(obs_1)
+        s = s_next
+
+        if step % snapshot_interval == 0:
+            league.add(snapshot())
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(
+                    f"Step {step}: {step * n_envs / elapsed:,.0f} steps/s, "
+                    f"{len(finished)} episodes, "
+                    f"avg reward (last 100): {np.mean(finished[-100:]):.2f}, "
+                    f"epsilon: {epsilon:.3f}, league size: {len(league)}"
+                )
+
+    return snapshot(), league, finished
+
+
+def evaluate(policy, opponent=None, episodes=10, max_steps=1000):
+    """Play `policy` against `opponent` with PongEnv's two-player API.
+
+    Args:
+        policy: Policy controlling player 1
+        opponent: Policy controlling player 2 from its mirrored view, or None
+            for the scripted opponent
+
+    Returns:
+        np.array: Total reward of each player per episode
+    """
+    env = PongEnv(max_steps=max_steps, two_player=opponent is not None)
+    totals = []
+    for _ in range(episodes):
+        obs, _ = env.reset()
+        total = np.zeros(2)
+        while True:
+            if opponent is None:
+                action = int(policy.act(obs)[0])
+                obs, reward, terminated, truncated, _ = env.step(action)
+                total[0] += reward
+            else:
+                actions = (int(policy.act(obs[0])[0]), int(opponent.act(obs[1])[0]))
+                obs, reward, terminated, truncated, _ = env.step(actions)
+                total += reward
+            if terminated or truncated:
+                break
+        totals.append(total)
+    env.close()
+    return np.array(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pong self-play training")
+    parser.add_argument("--envs", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=20_000)
+    parser.add_argument("--snapshot-interval", type=int, default=1000)
+    parser.add_argument("--league-size", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="pong_selfplay_policy.npz")
+    parser.add_argument("--league", default="pong_league.npz")
+    args = parser.parse_args()
+
+    policy, league, _ = train(
+        n_envs=args.envs,
+        steps=args.steps,
+        snapshot_interval=args.snapshot_interval,
+        league=League(args.league_size),
+        seed=args.seed,
+    )
+    policy.save(args.output)
+    league.save(args.league)
+
+    totals = evaluate(policy)
+    print(f"Against the scripted opponent: avg reward {totals[:, 0].mean():.2f}")
+    print(f"Saved {args.output} and {len(league.policies)} snapshots to {args.league}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+from collections import deque
+
+import numpy as np
+
+from env import PongEnv
+from train import SimpleQAgent
+
+
+def _sample_states(env, state, samples, rng, bin_size=50):
+    """Draw concrete game states that discretize to `state`.
+
+    The velocity's vertical sign and the opponent's position are not part of
+    the discrete state, so they are sampled freely.
+    """
+    ball_x_bin, ball_y_bin, ball_vx_bin, player1_y_bin = state
+    margin = env.ball.speed
+    max_player_y = env.height - env.player_1.rect.height
+
+    def draw(bin_index, low, high):
+        low = max(low, bin_index * bin_size)
+        high = min(high, (bin_index + 1) * bin_size - 1)
+        return rng.integers(low, high + 1, size=samples)
+
+    return zip(
+        draw(ball_x_bin, 0, env.width),
+        draw(ball_y_bin, -margin, env.height + margin),
+        np.full(samples, 1 if ball_vx_bin else -1),
+        rng.choice([-1, 1], size=samples),
+        draw(player1_y_bin, 0, max_player_y),
+        rng.integers(0, max_player_y + 1, size=samples),
+    )
+
+
+def _set_state(env, ball_x, ball_y, dir_x, dir_y, player1_y, player2_y):
+    env.current_step = 0
+    env.ball.pos.update(ball_x, ball_y)
+    env.ball.direction.update(dir_x, dir_y)
+    env.ball.first_time = True
+    env.player_1.rect.y = player1_y
+    env.player_2.rect.y = player2_y
+
+
+def build_model(env, agent, samples=8, seed=0):
+    """Estimate a sparse transition and reward model by simulating `env`.
+
+    Starting from the discretized reset state, every reachable discrete state
+    is expanded by simulating each action from `samples` concrete states.
+
+    Returns:
+        tuple: (states, rows, cols, probs, rewards) where `states` lists the
+            discrete states by id, (rows, cols, probs) is the COO transition
+            matrix from state-action row `s * n_actions + a` to next state id
+            (terminal transitions are left out), and `rewards` holds the
+            expected reward of every state-action row
+    """
+    rng = np.random.default_rng(seed)
+    n_actions = env.action_space.n
+
+    observation, _ = env.reset(seed=seed)
+    start = agent.discretize_state(observation)
+    ids = {start: 0}
+    states = [start]
+    queue = deque([start])
+
+    rows, cols, rewards = [], [], []
+    while queue:
+        state = queue.popleft()
+        sid = ids[state]
+        concrete = list(_sample_states(env, state, samples, rng))
+        for action in range(n_actions):
+            row = sid * n_actions + action
+            total_reward = 0.0
+            for values in concrete:
+                _set_state(env, *values)
+                observation, reward, terminated, _, _ = env.step(action)
+                total_reward += reward
+                if terminated:
+                    continue
+                next_state = agent.discretize_state(observation)
+                if next_state not in ids:
+                    ids[next_state] = len(states)
+                    states.append(next_state)
+                    queue.append(next_state)
+                rows.append(row)
+                cols.append(ids[next_state])
+            rewards.append(total_reward / samples)
+
+    # Merge duplicate (row, col) pairs into probabilities
+    rows, cols = np.array(rows), np.array(cols)
+    pairs, counts = np.unique(rows * len(states) + cols, return_counts=True)
+    return (
+        states,
+        pairs // len(states),
+        pairs % len(states),
+        counts / samples,
+        np.array(rewards),
+    )
+
+
+def value_iteration(
+    n_states, n_actions, rows, cols, probs, rewards, discount, tol=1e-6
+):
+    """Solve for Q-values with vectorized value iteration.
+
+    Returns:
+        tuple: (q_values of shape (n_states, n_actions), iterations)
+    """
+    q = np.zeros(n_states * n_actions)
+    for iteration in range(1, 100_000):
+        values = q.reshape(n_states, n_actions).max(axis=1)
+        expected = np.bincount(
+            rows, weights=probs * values[cols], minlength=n_states * n_actions
+        )
+        new_q = rewards + discount * expected
+        delta = np.abs(new_q - q).max()
+        q = new_q
+        if delta < tol:
+            break
+    return q.reshape(n_states, n_actions), iteration
+
+
+def solve(samples=8, seed=0, tol=1e-6, **env_kwargs):
+    """Build a model of the discretized env and return an agent that acts on it."""
+    env = PongEnv(**env_kwargs)
+    agent = SimpleQAgent(action_space_size=env.action_space.n, epsilon=0)
+
+    states, rows, cols, probs, rewards = build_model(env, agent, samples, seed)
+    q_values, iterations = value_iteration(
+        len(states), env.action_space.n, rows, cols, probs, rewards, agent.discount, tol
+    )
+    env.close()
+
+    agent.q_table = {state: list(q) for state, q in zip(states, q_values.tolist())}
+    return agent, iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve discretized Pong offline")
+    parser.add_argument("--output", default="pong_q_table.pkl")
+    parser.add_argument("--samples", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    agent, iterations = solve(samples=args.samples, seed=args.seed)
+    agent.save(args.output)
+    print(
+        f"Solved {len(agent.q_table)} states in {iterations} iterations "
+        f"({time.perf_counter() - start:.1f}s), saved to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
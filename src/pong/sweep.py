@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+import paths  # noqa: F401
+from common.sweep import main
+from train import train_agent
+
+# Each hyperparameter maps to a list of choices or a (low, high) range that is
+# sampled log-uniformly. In a JSON search space a range is {"low": .., "high": ..}.
+SEARCH_SPACE = {
+    "learning_rate": (0.01, 0.5),
+    "discount": [0.9, 0.95, 0.99],
+    "epsilon": [0.05, 0.1, 0.3, 1.0],
+    "epsilon_decay": [0.99, 0.995, 0.999],
+}
+
+
+def _run_trial(config, agent, episodes):
+    agent, rewards = train_agent(episodes, agent=agent, verbose=False, **config)
+    return agent, rewards
+
+
+if __name__ == "__main__":
+    main(_run_trial, SEARCH_SPACE, "Pong hyperparameter sweep", "pong_sweep.csv")
@@ -1,27 +1,73 @@
 #!/usr/bin/env python3
 
+import argparse
 import numpy as np
 from env import PongEnv
+from policy import Policy
+import paths  # noqa: F401
+from common.evaluator import AsyncEvaluator
+from common.tiles import TileCoder, TileQ
+from common.traces import ArrayQTable, EligibilityTraces, NStepWindow
+import pickle
 import random
+from functools import partial
+
+# Learning rules accepted by SimpleQAgent(update_mode=...)
+UPDATES = ("one_step", "n_step", "watkins")
 
 
 class SimpleQAgent:
-    """A simple Q-learning agent."""
+    """A simple Q-learning agent.
+
+    Q-values live in a dict keyed by coarse bins, or in a hashed tile-coding
+    store over the full observation when `tiles` is given.
+
+    `update_mode` picks the learning rule: "one_step" Q-learning, "n_step"
+    returns over `n_step` rewards, or Watkins Q(lambda) ("watkins") with
+    eligibility traces that decay by discount * lam and are cut after
+    exploratory actions. The multi-step rules keep the Q-table in an
+    ArrayQTable.
+    """
 
     def __init__(
-        self, action_space_size, learning_rate=0.1, epsilon=0.1, discount=0.95
+        self,
+        action_space_size,
+        learning_rate=0.1,
+        epsilon=0.1,
+        discount=0.95,
+        tiles=None,
+        update_mode="one_step",
+        n_step=3,
+        lam=0.9,
     ):
+        if update_mode not in UPDATES:
+            raise ValueError(f"Unknown update_mode: {update_mode!r}")
+        if tiles is not None and update_mode != "one_step":
+            raise ValueError("Multi-step updates need the tabular Q-table")
+
         self.action_space_size = action_space_size
         self.learning_rate = learning_rate
         self.epsilon = epsilon
         self.discount = discount
+        self.tiles = tiles
+        self.update_mode = update_mode
+        self.lam = lam
 
         # Simple state discretization for Q-table
-        self.q_table = {}
+        if update_mode == "one_step":
+            self.q_table = {}
+        else:
+            self.q_table = ArrayQTable(action_space_size)
+        self._window = NStepWindow(n_step, discount)
+        self._traces = EligibilityTraces()
 
     def discretize_state(self, observation):
         """Convert continuous observation to discrete state for Q-table."""
-        ball_x, ball_y, ball_vx, ball_vy, player1_y, player2_y = observation
+        if self.tiles is not None:
+            # Tile coding generalizes over the raw observation itself
+            return observation
+
+        ball_x, ball_y, ball_vx, ball_vy, player1_y, player2_y = observation[:6]
 
         # Discretize positions into bins
         ball_x_bin = int(ball_x // 50)
@@ -34,15 +80,50 @@ class SimpleQAgent:
     def get_action(self, state):
         """Choose action using epsilon-greedy policy."""
         if random.random() < self.epsilon:
-            return random.randint(0, self.action_space_size - 1)
+            action = random.randint(0, self.action_space_size - 1)
+            # Watkins' Q(lambda) only credits the greedy policy's past
+            if self.update_mode == "watkins" and action != np.argmax(
+                self.q_table[state]
+            ):
+                self._traces.clear()
+            return action
+
+        if self.tiles is not None:
+            return np.argmax(self.tiles[state])
 
         if state not in self.q_table:
             self.q_table[state] = [0.0] * self.action_space_size
 
         return np.argmax(self.q_table[state])
 
-    def update(self, state, action, reward, next_state):
-        """Update Q-values using Q-learning update rule."""
+    def update(self, state, action, reward, next_state, done=False):
+        """Update Q-values using Q-learning update rule.
+
+        `done` marks the last step of an episode, which flushes pending
+        n-step returns and clears eligibility traces.
+        """
+        if self.tiles is not None:
+            td_target = reward + self.discount * np.max(self.tiles[next_state])
+            self.tiles.update(state, action, td_target, self.learning_rate)
+            return
+
+        if self.update_mode == "n_step":
+            self._window.append(state, action, reward)
+            best_next = np.max(self.q_table[next_state])
+            for s, a, target in self._window.targets(best_next, flush=done):
+                self.q_table[s][a] += self.learning_rate * (target - self.q_table[s][a])
+            return
+
+        if self.update_mode == "watkins":
+            best_next = np.max(self.q_table[next_state])
+            td_error = reward + self.discount * best_next - self.q_table[state][action]
+            self._traces.visit(self.q_table.state_id(state), action)
+            self._traces.update(self.q_table.q, self.learning_rate * td_error)
+            self._traces.decay(self.discount * self.lam)
+            if done:
+                self._traces.clear()
+            return
+
         if state not in self.q_table:
             self.q_table[state] = [0.0] * self.action_space_size
 
@@ -55,16 +136,73 @@ class SimpleQAgent:
         td_error = td_target - self.q_table[state][action]
         self.q_table[state][action] += self.learning_rate * td_error
 
+    def save(self, path):
+        """Write the Q-table (or tile store) to `path`."""
+        with open(path, "wb") as f:
+            pickle.dump(self.q_table if self.tiles is None else self.tiles, f)
+
+    def load(self, path):
+        """Replace the Q-table (or tile store) with one written by `save`."""
+        with open(path, "rb") as f:
+            values = pickle.load(f)
+        if isinstance(values, TileQ):
+            self.tiles = values
+        elif self.update_mode != "one_step" and not isinstance(values, ArrayQTable):
+            self.q_table = ArrayQTable.from_dict(values, self.action_space_size)
+        else:
+            self.q_table = values
+
+
+def train_agent(
+    episodes=1000,
+    render=False,
+    agent=None,
+    learning_rate=0.1,
+    discount=0.95,
+    epsilon=0.1,
+    epsilon_decay=0.995,
+    verbose=True,
+    tile_coding=False,
+    update_mode="one_step",
+    evaluator=None,
+    eval_interval=50,
+):
+    """Train the agent on the Pong environment.
+
+    Passing a previously returned `agent` continues its training. With
+    `tile_coding` a new agent learns over hashed tiles of the whole
+    observation instead of the coarse Q-table bins. `update_mode` is passed
+    to a new SimpleQAgent.
+
+    With an AsyncEvaluator, a snapshot of the greedy policy is handed to it
+    every `eval_interval` episodes and evaluated while training continues,
+    instead of pausing for `test_trained_agent`.
+    """
+    env = PongEnv(render_mode="viewer" if render else None, max_steps=1000)
+    if agent is None:
+        agent = SimpleQAgent(
+            action_space_size=env.action_space.n,
+            learning_rate=learning_rate,
+            epsilon=epsilon,
+            discount=discount,
+            tiles=(
+                TileQ(TileCoder.from_space(env.observation_space), env.action_space.n)
+                if tile_coding
+                else None
+            ),
+            update_mode=update_mode,
+        )
 
-def train_agent(episodes=1000, render=False):
-    """Train the agent on the Pong environment."""
-    env = PongEnv(render_mode="human" if render else None, max_steps=1000)
-    agent = SimpleQAgent(action_space_size=env.action_space.n)
+    def greedy(observation):
+        # Called in the evaluator's forked child, on its copy of the agent
+        agent.epsilon = 0
+        return agent.get_action(agent.discretize_state(observation))
 
     episode_rewards = []
     training_interrupted = False
 
-    print(f"Training for {episodes} episodes...")
+    if verbose:
+        print(f"Training for {episodes} episodes...")
     if render:
         print("Close the pygame window to stop training early.")
 
@@ -76,24 +214,19 @@ def train_agent(episodes=1000, render=False):
         step_count = 0
 
         while True:
-            # Handle pygame events if rendering
-            if render:
-                import pygame
-
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        training_interrupted = True
-                        break
-
-                if training_interrupted:
-                    break
+            # Stop if the viewer window was closed
+            if render and not env.viewer.is_open():
+                training_interrupted = True
+                break
 
             action = agent.get_action(state)
             next_observation, reward, terminated, truncated, info = env.step(action)
             next_state = agent.discretize_state(next_observation)
 
             # Update agent
-            agent.update(state, action, reward, next_state)
+            agent.update(
+                state, action, reward, next_state, done=terminated or truncated
+            )
 
             total_reward += reward
             step_count += 1
@@ -113,10 +246,10 @@ def train_agent(episodes=1000, render=False):
 
         # Decay epsilon for exploration
         if agent.epsilon > 0.01:
-            agent.epsilon *= 0.995
+            agent.epsilon *= epsilon_decay
 
-        # Print progress
-        if (episode + 1) % 10 == 0:  # More frequent updates for visual training
+        # Print progress (more frequent updates for visual training)
+        if verbose and (episode + 1) % 10 == 0:
             avg_reward = (
                 np.mean(episode_rewards[-10:])
                 if len(episode_rewards) >= 10
@@ -127,6 +260,11 @@ def train_agent(episodes=1000, render=False):
                 f"Epsilon: {agent.epsilon:.3f}, Steps: {step_count}"
             )
 
+        if evaluator is not None:
+            evaluator.poll()
+            if (episode + 1) % eval_interval == 0:
+                evaluator.submit(greedy, episode + 1)
+
     env.close()
     return agent, episode_rewards
 
@@ -169,6 +307,14 @@ def test_trained_agent(agent, episodes=5):
 
 def main():
     """Main training function."""
+    parser = argparse.ArgumentParser(description="Train a Pong Q-learning agent")
+    parser.add_argument(
+        "--policy",
+        metavar="PATH",
+        help="Also save the compiled greedy policy here, for server.py",
+    )
+    args = parser.parse_args()
+
     print("=== Pong RL Training ===")
 
     # Ask if user wants to watch training
@@ -193,12 +339,35 @@ def main():
         print("\nInterrupted by user.")
         return
 
+    # Greedy episodes on snapshots, played in the background while training
+    evaluator = None
+    if AsyncEvaluator.available():
+        evaluator = AsyncEvaluator(
+            partial(PongEnv, max_steps=1000),
+            episodes=10,
+            on_report=lambda result: print(
+                f"Eval after episode {result['step']}: "
+                f"Avg Reward: {result['mean_reward']:.2f}, "
+                f"Avg Steps: {result['mean_steps']:.0f}"
+            ),
+        )
+
     # Train the agent
-    agent, rewards = train_agent(episodes=episodes, render=render_training)
+    agent, rewards = train_agent(
+        episodes=episodes, render=render_training, evaluator=evaluator
+    )
+    if evaluator is not None:
+        evaluator.close()
 
     print(f"\nTraining completed!")
     print(f"Final average reward (last 100 episodes): {np.mean(rewards[-100:]):.2f}")
 
+    # Compile the greedy policy for serving (see server.py)
+    if args.policy:
+        env = PongEnv()
+        Policy.from_agent(agent, env).save(args.policy)
+        env.close()
+
     # Test the trained agent
     if not render_training:  # Only ask if we didn't already render during training
         try:
@@ -0,0 +1,171 @@
+import math
+
+# Closed-form helpers for the piecewise-linear Pong dynamics.
+#
+# Between paddle contacts the ball moves by a constant velocity each step and
+# only flips its vertical direction on the walls, so positions, wall bounces,
+# the ball-following opponent and the per-step distance penalty can all be
+# computed for a whole run of steps at once instead of one env step at a time.
+
+
+def steps_until_wall(y, vy, height):
+    """Number of steps until `Ball.update` flips the vertical direction."""
+    if vy < 0:
+        return max(1, math.ceil(y / -vy))
+    if vy > 0:
+        return max(1, math.ceil((height - y) / vy))
+    return math.inf
+
+
+def advance_ball_y(y, vy, steps, height):
+    """Vertical ball position and velocity after `steps` updates."""
+    while steps > 0:
+        to_wall = steps_until_wall(y, vy, height)
+        if steps < to_wall:
+            return y + steps * vy, vy
+        y += to_wall * vy
+        vy = -vy
+        steps -= to_wall
+    return y, vy
+
+
+def steps_in_lane(x, vx, radius, left_bound, right_bound):
+    """Number of steps the ball stays clear of both paddle columns.
+
+    Args:
+        x: Ball center x
+        vx: Horizontal ball velocity per step
+        radius: Ball radius
+        left_bound: Right edge of the left paddle
+        right_bound: Left edge of the right paddle
+
+    Returns:
+        int: Largest n such that the ball rect after each of the next n steps
+            overlaps neither paddle column (0 if the very next step does)
+    """
+    # Ball.get_rect() truncates x - radius to an int, so these are the exact
+    # bounds on the ball center for which the rect stays between the paddles.
+    lo = left_bound + radius
+    hi = right_bound - radius + 1
+    if vx < 0:
+        if not x + vx < hi:
+            return 0
+        return max(0, math.floor((x - lo) / -vx))
+    if vx > 0:
+        if not x + vx >= lo:
+            return 0
+        return max(0, math.ceil((hi - x) / vx) - 1)
+    return math.inf if lo <= x < hi else 0
+
+
+def predict_intercept(x, y, vx, vy, radius, left_bound, right_bound, height):
+    """Ball y when it next reaches the left paddle column.
+
+    A ball moving right is assumed to be returned by the right paddle.
+    """
+    if vx > 0:
+        steps = steps_in_lane(x, vx, radius, left_bound, right_bound) + 1
+        y, vy = advance_ball_y(y, vy, steps, height)
+        x, vx = x + steps * vx, -vx
+    steps = steps_in_lane(x, vx, radius, left_bound, right_bound) + 1
+    y, _ = advance_ball_y(y, vy, steps, height)
+    return y
+
+
+def sum_abs_linear(a, d, steps):
+    """Closed form of sum(abs(a + t * d) for t in range(1, steps + 1))."""
+    if steps <= 0:
+        return 0.0
+    first, last = a + d, a + steps * d
+    if first * last >= 0:
+        return abs(steps * (first + last) / 2)
+    # Split the run where the sign changes
+    k = math.floor(-a / d) if d > 0 else math.floor(a / -d)
+    return sum_abs_linear(a, d, k) + sum_abs_linear(a + k * d, d, steps - k)
+
+
+def _track_step(c, b, speed, deadband, c_min, c_max):
+    if b < c - deadband:
+        return max(c_min, c - speed)
+    if b > c + deadband:
+        return min(c_max, c + speed)
+    return c
+
+
+def _unclamped_steps(b, vy, steps, speed, c_min, c_max):
+    # The tracker never overshoots the ball by more than `speed`, so as long as
+    # the ball stays `speed` away from the clamp range the clamps never bind.
+    lo, hi = c_min + speed, c_max - speed
+    if not lo <= b <= hi:
+        return 0
+    if vy > 0:
+        return min(steps, math.floor((hi - b) / vy) + 1)
+    if vy < 0:
+        return min(steps, math.floor((b - lo) / -vy) + 1)
+    return steps
+
+
+def _jump_unclamped(c, b, vy, steps, speed, deadband):
+    # Iterate the gap g = ball - paddle center, which evolves independently of
+    # the absolute positions while the clamps don't bind.
+    g = b - c
+    if g > deadband:
+        closing = speed - vy
+        k = steps if closing <= 0 else min(steps, math.ceil((g - deadband) / closing))
+        g -= k * closing
+        steps -= k
+    elif g < -deadband:
+        closing = speed + vy
+        k = steps if closing <= 0 else min(steps, math.ceil((-deadband - g) / closing))
+        g += k * closing
+        steps -= k
+
+    # Inside the dead band the gap cycles through a handful of values
+    history = []
+    index = {}
+    while steps > 0:
+        if g in index:
+            start = index[g]
+            g = history[start + steps % (len(history) - start)]
+            break
+        index[g] = len(history)
+        history.append(g)
+        if g > deadband:
+            g -= speed
+        elif g < -deadband:
+            g += speed
+        g += vy
+        steps -= 1
+    return g
+
+
+def advance_tracker(c, b, vy, steps, speed, deadband, c_min, c_max):
+    """Paddle center of the ball-following opponent after `steps` steps.
+
+    The ball must not bounce off a wall during these steps.
+
+    Args:
+        c: Paddle center y
+        b: Ball y seen by the opponent on the first step
+        vy: Vertical ball velocity per step
+        steps: Number of steps to advance
+        speed: Paddle speed per step
+        deadband: Distance within which the opponent stays put
+        c_min: Lowest reachable paddle center
+        c_max: Highest reachable paddle center
+
+    Returns:
+        Paddle center y after the last step
+    """
+    while steps > 0:
+        free = _unclamped_steps(b, vy, steps, speed, c_min, c_max)
+        if free:
+            g = _jump_unclamped(c, b, vy, free, speed, deadband)
+            b += free * vy
+            c = b - g
+            steps -= free
+        else:
+            c = _track_step(c, b, speed, deadband, c_min, c_max)
+            b += vy
+            steps -= 1
+    return c
@@ -0,0 +1,84 @@
+import multiprocessing as mp
+import time
+
+import pygame
+
+import paths  # noqa: F401
+from common.slot import SnapshotSlot
+from constants import GREEN, WHITE, BLACK, FPS
+
+# Snapshot layout: [ball_x, ball_y, player1_y, player2_y]
+SNAPSHOT_SIZE = 4
+
+
+def _run_viewer(slot, width, height, paddles, ball_radius, fps, title):
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption(title)
+    clock = pygame.time.Clock()
+    rects = [pygame.Rect(x, 0, w, h) for x, w, h in paddles]
+
+    last_seq = 0
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+
+        latest = slot.read(last_seq)
+        if latest is not None:
+            last_seq, (ball_x, ball_y, player1_y, player2_y) = latest
+            rects[0].y, rects[1].y = int(player1_y), int(player2_y)
+
+            screen.fill(BLACK)
+            for rect in rects:
+                pygame.draw.rect(screen, GREEN, rect)
+            pygame.draw.circle(screen, WHITE, (int(ball_x), int(ball_y)), ball_radius)
+            pygame.draw.line(screen, WHITE, (width // 2, 0), (width // 2, height), 2)
+            pygame.display.flip()
+
+        clock.tick(fps)
+
+
+class Viewer:
+    """Renders a game in a separate process without slowing down the trainer.
+
+    `publish` only copies a compact snapshot into shared memory (at most `fps`
+    times per second) and never blocks; frames the viewer misses are dropped.
+    """
+
+    def __init__(self, width, height, paddles, ball_radius, fps=FPS, title="Pong"):
+        """
+        Args:
+            width: Court width
+            height: Court height
+            paddles: (x, width, height) of the left and right paddle
+            ball_radius: Ball radius
+            fps: Viewer frame rate
+            title: Window caption
+        """
+        ctx = mp.get_context("spawn")
+        self.slot = SnapshotSlot(ctx, SNAPSHOT_SIZE, "d")
+        self.min_interval = 1 / fps
+        self._last_publish = 0.0
+        self.process = ctx.Process(
+            target=_run_viewer,
+            args=(self.slot, width, height, paddles, ball_radius, fps, title),
+            daemon=True,
+        )
+        self.process.start()
+
+    def publish(self, ball, player_1, player_2):
+        now = time.perf_counter()
+        if now - self._last_publish < self.min_interval:
+            return
+        self._last_publish = now
+        self.slot.publish((ball.pos.x, ball.pos.y, player_1.rect.y, player_2.rect.y))
+
+    def is_open(self):
+        return self.process.is_alive()
+
+    def close(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
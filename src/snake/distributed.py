@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import io
+import multiprocessing as mp
+import socket
+import struct
+import time
+import zlib
+from collections import defaultdict, deque
+
+import numpy as np
+
+from env import SnakeEnv
+
+# Every message is a fixed header (kind, flags, version, payload byte count)
+# followed by a zlib-compressed run of arrays in .npy format, which are loaded
+# with allow_pickle=False so a peer can only ever send plain arrays.
+#   PULL   actor -> server: version = the actor's parameter version, no arrays
+#   PUSH   actor -> server: version = the parameters the transitions were
+#          collected with; states, actions, rewards, next_states, dones
+#   PARAMS server -> actor: states, q_values of every state changed since the
+#          actor's version, or of the whole table with the FULL flag
+#   ACK    server -> actor: no arrays
+# Replies carry the server's version and the STOP flag once training is done.
+HEADER = struct.Struct("!BBQI")
+PULL, PUSH, PARAMS, ACK = range(4)
+STOP, FULL = 1, 2
+# Largest payload accepted, compressed or not
+MAX_PAYLOAD = 64 * 2**20
+
+
+def _encode(kind, version, arrays=(), flags=0):
+    buffer = io.BytesIO()
+    for array in arrays:
+        np.save(buffer, array, allow_pickle=False)
+    payload = zlib.compress(buffer.getvalue()) if arrays else b""
+    return HEADER.pack(kind, flags, version, len(payload)) + payload
+
+
+def _decode(payload, count):
+    """Unpack `count` arrays from a message payload.
+
+    Raises:
+        ValueError: If the payload is too large or not exactly `count` arrays
+    """
+    if not count:
+        if payload:
+            raise ValueError("Unexpected message payload")
+        return []
+    inflater = zlib.decompressobj()
+    try:
+        data = inflater.decompress(payload, MAX_PAYLOAD)
+    except zlib.error as error:
+        raise ValueError(f"Corrupt message payload: {error}") from error
+    if inflater.unconsumed_tail:
+        raise ValueError("Message payload is too large")
+    buffer = io.BytesIO(data)
+    arrays = [np.load(buffer, allow_pickle=False) for _ in range(count)]
+    if buffer.tell() != len(data):
+        raise ValueError("Unexpected data after message arrays")
+    return arrays
+
+
+def _read_header(data):
+    kind, flags, version, size = HEADER.unpack(data)
+    if size > MAX_PAYLOAD:
+        raise ValueError("Message payload is too large")
+    return kind, flags, version, size
+
+
+def _recv_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Parameter server closed the connection")
+        data += chunk
+    return data
+
+
+class ParameterServer:
+    """Owns the Q-table and applies the transitions pushed by actors.
+
+    Actors that disconnect, crash or send malformed messages are dropped
+    without affecting the others. Pulls only carry the states that changed
+    since the actor's version while the last `history` pushes cover it, and
+    the whole table otherwise.
+    """
+
+    def __init__(
+        self,
+        n_actions,
+        alpha=0.1,
+        gamma=0.99,
+        max_transitions=1_000_000,
+        history=256,
+    ):
+        self.n_actions = n_actions
+        self.alpha = alpha
+        self.gamma = gamma
+        self.max_transitions = max_transitions
+        self.q_table = defaultdict(lambda: np.zeros(n_actions))
+        self.version = 0
+        self.stopped = False
+        # (version, states updated by the push that produced it)
+        self._history = deque(maxlen=history)
+
+        # Metrics
+        self.transitions = 0
+        self.staleness = deque(maxlen=1000)
+        self.actors = set()
+        self.failed_actors = 0
+        self.full_pulls = 0
+        self.delta_pulls = 0
+
+    @property
+    def done(self):
+        return self.transitions >= self.max_transitions
+
+    def validate(self, batch):
+        """Check that a pushed batch is a well-formed set of transitions.
+
+        Raises:
+            ValueError: If the arrays do not describe the same transitions
+        """
+        states, actions, rewards, next_states, dones = batch
+        n = len(actions)
+        if not (
+            states.ndim == 2
+            and states.shape == next_states.shape
+            and len(states) == n
+            and actions.shape == rewards.shape == dones.shape == (n,)
+            and states.dtype == next_states.dtype == np.int8
+            and actions.dtype == np.int8
+            and rewards.dtype == np.float32
+            and dones.dtype == bool
+        ):
+            raise ValueError("Malformed transition batch")
+        if n and (actions.min() < 0 or actions.max() >= self.n_actions):
+            raise ValueError("Action out of range")
+        if not np.all(np.isfinite(rewards)):
+            raise ValueError("Non-finite reward")
+
+    def apply(self, batch):
+        """Q-learning updates for a batch of (s, a, r, s', done) arrays."""
+        states, actions, rewards, next_states, dones = batch
+        updated = set()
+        for s, a, r, s_next, done in zip(
+            map(tuple, states.tolist()),
+            actions.tolist(),
+            rewards.tolist(),
+            map(tuple, next_states.tolist()),
+            dones.tolist(),
+        ):
+            best_next = 0.0 if done else np.max(self.q_table[s_next])
+            q = self.q_table[s]
+            q[a] += self.alpha * (r + self.gamma * best_next - q[a])
+            updated.add(s)
+        self.transitions += len(actions)
+        self.version += 1
+        self._history.append((self.version, updated))
+
+    def changes_since(self, version):
+        """States updated after `version`, or None if history does not reach it."""
+        if version == self.version:
+            return set()
+        if version > self.version or not self._history:
+            return None
+        if self._history[0][0] > version + 1:
+            return None
+        changed = set()
+        for pushed, states in self._history:
+            if pushed > version:
+                changed |= states
+        return changed
+
+    def snapshot(self, states=None):
+        """States and Q-values of `states`, or of the whole table if None."""
+        keys = list(self.q_table if states is None else states)
+        width = len(keys[0]) if keys else 0
+        state_array = np.array(keys, dtype=np.int8).reshape(len(keys), width)
+        q_values = np.array([self.q_table[s] for s in keys], dtype=np.float32).reshape(
+            len(keys), self.n_actions
+        )
+        return state_array, q_values
+
+    def _reply(self, kind, flags, version, payload):
+        stop = STOP if self.done else 0
+        if kind == PULL:
+            _decode(payload, 0)
+            changed = self.changes_since(version)
+            if changed is None:
+                self.full_pulls += 1
+                return _encode(PARAMS, self.version, self.snapshot(), flags=stop | FULL)
+            self.delta_pulls += 1
+            return _encode(PARAMS, self.version, self.snapshot(changed), flags=stop)
+        if kind == PUSH:
+            batch = _decode(payload, 5)
+            self.validate(batch)
+            self.staleness.append(self.version - version)
+            if not self.done:
+                self.apply(batch)
+            return _encode(ACK, self.version, flags=STOP if self.done else 0)
+        raise ValueError(f"Unexpected message kind: {kind}")
+
+    async def _handle(self, reader, writer):
+        actor = writer.get_extra_info("peername")
+        self.actors.add(actor)
+        try:
+            while True:
+                kind, flags, version, size = _read_header(
+                    await reader.readexactly(HEADER.size)
+                )
+                payload = await reader.readexactly(size)
+                writer.write(self._reply(kind, flags, version, payload))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            if not self.done:
+                self.failed_actors += 1
+        finally:
+            self.actors.discard(actor)
+            writer.close()
+
+    def metrics(self, elapsed):
+        staleness = np.array(self.staleness or [0])
+        return {
+            "transitions": self.transitions,
+            "transitions_per_s": self.transitions / max(elapsed, 1e-9),
+            "version": self.version,
+            "mean_staleness": float(staleness.mean()),
+            "max_staleness": int(staleness.max()),
+            "live_actors": len(self.actors),
+            "failed_actors": self.failed_actors,
+            "full_pulls": self.full_pulls,
+            "delta_pulls": self.delta_pulls,
+            "states": len(self.q_table),
+        }
+
+    async def serve(self, sock, report_interval=5.0, on_report=None):
+        """Serve actors on the bound `sock` until max_transitions is reached."""
+        server = await asyncio.start_server(self._handle, sock=sock)
+        start = time.perf_counter()
+        last_report = start
+        async with server:
+            while not self.stopped and (not self.done or self.actors):
+                await asyncio.sleep(0.1)
+                now = time.perf_counter()
+                if on_report is not None and now - last_report >= report_interval:
+                    last_report = now
+                    on_report(self.metrics(now - start))
+        return self.metrics(time.perf_counter() - start)
+
+
+def run_actor(host, port, epsilon, pull_interval=1000, push_batch=256, seed=None):
+    """Collect SnakeEnv transitions with the latest parameters and push them."""
+    try:
+        sock = socket.create_connection((host, port))
+    except ConnectionRefusedError:
+        # The server already finished while this actor was starting
+        return
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def request(kind, version, arrays=()):
+        sock.sendall(_encode(kind, version, arrays))
+        reply, flags, version, size = _read_header(_recv_exactly(sock, HEADER.size))
+        count = 2 if reply == PARAMS else 0
+        return flags, version, _decode(_recv_exactly(sock, size), count)
+
+    env = SnakeEnv(obs_mode="danger")
+    q_table = defaultdict(lambda: np.zeros(env.action_space.n))
+
+    def pull(version):
+        flags, version, (states, q_values) = request(PULL, version)
+        if flags & FULL:
+            q_table.clear()
+        q_table.update(zip(map(tuple, states.tolist()), q_values))
+        return version, bool(flags & STOP)
+
+    rng = np.random.default_rng(seed)
+    version, stop = pull(0)
+    buffer = []
+    steps = 0
+
+    obs, _ = env.reset(seed=seed)
+    while not stop:
+        state = tuple(obs.tolist())
+        if rng.random() < epsilon:
+            action = int(rng.integers(env.action_space.n))
+        else:
+            action = int(np.argmax(q_table[state]))
+
+        obs, reward, terminated, truncated, _ = env.step(action)
+        buffer.append((state, action, reward, tuple(obs.tolist()), terminated))
+        steps += 1
+
+        if terminated or truncated:
+            obs, _ = env.reset()
+
+        if len(buffer) >= push_batch:
+            states, actions, rewards, next_states, dones = zip(*buffer)
+            batch = (
+                np.array(states, dtype=np.int8),
+                np.array(actions, dtype=np.int8),
+                np.array(rewards, dtype=np.float32),
+                np.array(next_states, dtype=np.int8),
+                np.array(dones, dtype=bool),
+            )
+            flags, _, _ = request(PUSH, version, batch)
+            stop = bool(flags & STOP)
+            buffer = []
+
+        if steps % pull_interval == 0 and not stop:
+            version, stop = pull(version)
+
+    sock.close()
+
+
+def train(
+    actors=4,
+    max_transitions=200_000,
+    pull_interval=1000,
+    push_batch=256,
+    restart_failed=True,
+    report_interval=5.0,
+    host="127.0.0.1",
+    port=0,
+):
+    """Run a parameter server on `host`:`port` and local actor processes.
+
+    With `actors=0` the server only serves actors started elsewhere with
+    `run_actor`, until max_transitions is reached and they disconnect.
+
+    Returns:
+        tuple: (q_table, final metrics)
+    """
+    ctx = mp.get_context("spawn")
+    sock = socket.create_server((host, port))
+    port = sock.getsockname()[1]
+    # Local actors reach a wildcard address through loopback
+    local_host = "127.0.0.1" if host in ("", "0.0.0.0") else host
+    server = ParameterServer(
+        SnakeEnv(obs_mode="danger").action_space.n, max_transitions=max_transitions
+    )
+
+    # Spread exploration rates across actors, from 0.4 down to ~0.0007
+    epsilons = [0.4 ** (1 + 7 * i / max(actors - 1, 1)) for i in range(actors)]
+
+    def spawn(i):
+        process = ctx.Process(
+            target=run_actor,
+            args=(local_host, port, epsilons[i], pull_interval, push_batch, i),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    async def supervise():
+        processes = [spawn(i) for i in range(actors)]
+        serving = asyncio.create_task(
+            server.serve(sock, report_interval, on_report=print)
+        )
+        while not serving.done():
+            await asyncio.sleep(1.0)
+            for i, process in enumerate(processes):
+                if not process.is_alive() and restart_failed and not server.done:
+                    processes[i] = spawn(i)
+            if processes and not any(process.is_alive() for process in processes):
+                server.stopped = True
+        for process in processes:
+            process.join(timeout=5)
+        return await serving
+
+    metrics = asyncio.run(supervise())
+    return server.q_table, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed Snake Q-learning")
+    parser.add_argument(
+        "--role",
+        choices=["server", "actor"],
+        default="server",
+        help="Run the parameter server (with --actors local actors) or one actor",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address the server binds to, or the actor connects to",
+    )
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--actors", type=int, default=4)
+    parser.add_argument("--transitions", type=int, default=200_000)
+    parser.add_argument("--pull-interval", type=int, default=1000)
+    parser.add_argument("--push-batch", type=int, default=256)
+    parser.add_argument("--epsilon", type=float, default=0.1, help="Actor only")
+    parser.add_argument("--seed", type=int, help="Actor only")
+    args = parser.parse_args()
+
+    if args.role == "actor":
+        run_actor(
+            args.host,
+            args.port,
+            args.epsilon,
+            pull_interval=args.pull_interval,
+            push_batch=args.push_batch,
+            seed=args.seed,
+        )
+        return
+
+    _, metrics = train(
+        actors=args.actors,
+        max_transitions=args.transitions,
+        pull_interval=args.pull_interval,
+        push_batch=args.push_batch,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Finished: {metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,15 @@ from typing import Optional
 
 import pygame
 from game import Game
+from viewer import Viewer
+from rewards import RewardFunction
 from constants import WIDTH, HEIGHT, SIZE, FPS
 
+# Grid step for each heading, and the headings to its left and right
+HEADINGS = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+TURN_LEFT = {"up": "left", "left": "down", "down": "right", "right": "up"}
+TURN_RIGHT = {"up": "right", "right": "down", "down": "left", "left": "up"}
+
 # 🎯 What skill should the agent learn? [how to play the game snake]
 # 👀 What information does the agent need? [food_pos, head_pos, distance_from_food]
 # 🎮 What actions can the agent take? [Discrete choices: up, down, left, right]
@@ -14,40 +21,78 @@ from constants import WIDTH, HEIGHT, SIZE, FPS
 
 
 class SnakeEnv(gym.Env):
-    def __init__(self, render_mode=None, max_steps=1000):
+    def __init__(
+        self,
+        render_mode=None,
+        max_steps=1000,
+        obs_mode="coords",
+        view_radius=0,
+        width=WIDTH,
+        height=HEIGHT,
+        size=SIZE,
+        reward_fn=None,
+    ):
         super().__init__()
 
+        if obs_mode not in ("coords", "danger"):
+            raise ValueError(f"Unknown obs_mode: {obs_mode!r}")
+
         self.render_mode = render_mode
         self.max_steps = max_steps
+        self.obs_mode = obs_mode
+        self.view_radius = view_radius
+        self.width = width
+        self.height = height
+        self.size = size
         self.current_step = 0
         self.clock = pygame.time.Clock()
 
+        # Reward computed from each step's event record (see rewards.py)
+        self.reward_fn = reward_fn or RewardFunction()
+        self._prev_dist = None
+
         self.game = Game(
-            title="Snake - RL Training", render_ui=self.render_mode == "human"
+            title="Snake - RL Training",
+            render_ui=self.render_mode == "human",
+            width=width,
+            height=height,
+            size=size,
         )
 
-        adjusted_width = WIDTH - SIZE
-        adjusted_height = HEIGHT - SIZE
-
-        # Observation space [rel_food_x, rel_food_y, food_x, food_y, head_x, head_y, direction]
-        self.observation_space = gym.spaces.Box(
-            low=np.array(
-                [-adjusted_width, -adjusted_height, 0, 0, 0, 0, 0], dtype=np.float32
-            ),
-            high=np.array(
-                [
-                    adjusted_width,
-                    adjusted_height,
-                    adjusted_width,
-                    adjusted_height,
-                    adjusted_width,
-                    adjusted_height,
-                    3,
-                ],
+        # Separate process that mirrors the game without throttling training
+        if self.render_mode == "viewer":
+            self.viewer = Viewer(width, height, size, title="Snake - RL Training")
+
+        adjusted_width = width - size
+        adjusted_height = height - size
+        self._max_distance = adjusted_width**2 + adjusted_height**2
+
+        if self.obs_mode == "danger":
+            # Observation space [danger_straight, danger_left, danger_right,
+            # food_up, food_down, food_left, food_right, heading (one-hot x4),
+            # egocentric window cells (optional)]
+            window = (2 * self.view_radius + 1) ** 2 - 1
+            self.observation_space = gym.spaces.MultiBinary(11 + window)
+        else:
+            # Observation space [rel_food_x, rel_food_y, food_x, food_y, head_x, head_y, direction]
+            self.observation_space = gym.spaces.Box(
+                low=np.array(
+                    [-adjusted_width, -adjusted_height, 0, 0, 0, 0, 0], dtype=np.float32
+                ),
+                high=np.array(
+                    [
+                        adjusted_width,
+                        adjusted_height,
+                        adjusted_width,
+                        adjusted_height,
+                        adjusted_width,
+                        adjusted_height,
+                        3,
+                    ],
+                    dtype=np.float32,
+                ),
                 dtype=np.float32,
-            ),
-            dtype=np.float32,
-        )
+            )
 
         # 0=up, 1=down, 2=left, 3=right
         self.action_space = gym.spaces.Discrete(4)
@@ -58,6 +103,9 @@ class SnakeEnv(gym.Env):
         Returns:
             np.array: Observation with relative food and player positions
         """
+        if self.obs_mode == "danger":
+            return self._get_danger_obs()
+
         dir_map = {"up": 0, "down": 1, "left": 2, "right": 3}
         rel_food_x = self.game.food.x - self.game.player.head.x
         rel_food_y = self.game.food.y - self.game.player.head.y
@@ -74,6 +122,43 @@ class SnakeEnv(gym.Env):
             dtype=np.float32,
         )
 
+    def _get_danger_obs(self):
+        """Egocentric features read from the snake's occupancy grid.
+
+        Returns:
+            np.array: Binary danger, food direction and heading features,
+                followed by the blocked cells around the head (rotated so that
+                the snake faces up) when view_radius > 0
+        """
+        player = self.game.player
+        heading = player.direction
+        cx, cy = player.head.x // self.size, player.head.y // self.size
+        fx, fy = self.game.food.x // self.size, self.game.food.y // self.size
+
+        features = []
+        for turn in (heading, TURN_LEFT[heading], TURN_RIGHT[heading]):
+            dx, dy = HEADINGS[turn]
+            features.append(player.is_blocked(cx + dx, cy + dy))
+        features += [fy < cy, fy > cy, fx < cx, fx > cx]
+        features += [heading == name for name in HEADINGS]
+
+        if self.view_radius:
+            ahead_x, ahead_y = HEADINGS[heading]
+            right_x, right_y = HEADINGS[TURN_RIGHT[heading]]
+            r = self.view_radius
+            for forward in range(r, -r - 1, -1):
+                for side in range(-r, r + 1):
+                    if forward == 0 and side == 0:
+                        continue
+                    features.append(
+                        player.is_blocked(
+                            cx + forward * ahead_x + side * right_x,
+                            cy + forward * ahead_y + side * right_y,
+                        )
+                    )
+
+        return np.array(features, dtype=np.int8)
+
     def _get_info(self):
         """Compute auxiliary information for debugging.
 
@@ -107,6 +192,7 @@ class SnakeEnv(gym.Env):
 
         self.game._reset()
         self.current_step = 0
+        self._prev_dist = None
 
         obs = self._get_obs()
         info = self._get_info()
@@ -122,7 +208,8 @@ class SnakeEnv(gym.Env):
         Returns:
             tuple: (observation, reward, terminated, truncated, info)
         """
-        self.clock.tick(FPS)
+        if self.render_mode == "human":
+            self.clock.tick(FPS)
         self.current_step += 1
 
         action_map = {0: "up", 1: "down", 2: "left", 3: "right"}
@@ -131,32 +218,29 @@ class SnakeEnv(gym.Env):
         self.game._handle_input(direction)
         self.game.player.move()
 
-        # Calculate distance to food before and after move
-        prev_dist = getattr(self, "_prev_dist", None)
-        curr_dist = (self.game.player.head.x - self.game.food.x) ** 2 + (
+        # Everything the reward terms need, computed once per step
+        dist = (self.game.player.head.x - self.game.food.x) ** 2 + (
             self.game.player.head.y - self.game.food.y
         ) ** 2
-        self._prev_dist = curr_dist
-
-        reward = -0.01  # small negative reward per step
-        terminated = False
-
-        # small reward for body length
-        if len(self.game.player.body) > 1:
-            reward += 0.1 * (len(self.game.player.body) - 1)
-
-        max_distance = (WIDTH - SIZE) ** 2 + (HEIGHT - SIZE) ** 2
+        events = {
+            "ate": self.game._collision_check(),
+            "died": not self.game.player.is_alive,
+            "length": len(self.game.player.body),
+            "dist": dist,
+            "prev_dist": dist if self._prev_dist is None else self._prev_dist,
+            "max_distance": self._max_distance,
+        }
+        self._prev_dist = dist
 
-        if self.game._collision_check():
-            reward = 10
+        reward = self.reward_fn(events)
+        terminated = events["died"] and not events["ate"]
+        if events["ate"]:
             self.game.player.eat()
-        elif not self.game.player.is_alive:
-            reward = -10
-            terminated = True
-        else:
-            # Reward for getting closer to food, penalize for moving away
-            if prev_dist is not None:
-                reward += 0.1 * (prev_dist - curr_dist) / (max_distance + 1e-8)
+            # New food on a free cell, approach shaping restarts from there
+            self.game._spawn_food()
+            self._prev_dist = (self.game.player.head.x - self.game.food.x) ** 2 + (
+                self.game.player.head.y - self.game.food.y
+            ) ** 2
 
         truncated = self.current_step >= self.max_steps
 
@@ -170,7 +254,11 @@ class SnakeEnv(gym.Env):
             self.game._render()
         if self.render_mode == "rgb_array":
             self.game._record()
+        if self.render_mode == "viewer":
+            self.viewer.publish(self.game)
 
     def close(self):
         if self.render_mode == "human":
             self.game.end()
+        if self.render_mode == "viewer":
+            self.viewer.close()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import time
+from collections import defaultdict
+from functools import partial
+
+import numpy as np
+
+from env import SnakeEnv
+from train import BINS, discretize, train
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Grid step for each action (0=up, 1=down, 2=left, 3=right) and its reverse
+STEPS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+DX = np.array([dx for dx, _ in STEPS])
+DY = np.array([dy for _, dy in STEPS])
+REVERSE = [1, 0, 3, 2]
+ACTIONS = {"up": 0, "down": 1, "left": 2, "right": 3}
+
+
+def _search(free, sx, sy, tx, ty, distances):
+    # Breadth-first search over `free` cells from (sx, sy) that fills in
+    # `distances` and stops early once it steps onto (tx, ty)
+    n_cols, n_rows = free.shape
+    distances[:, :] = -1
+    distances[sx, sy] = 0
+    queue = np.empty(n_cols * n_rows, dtype=np.int64)
+    queue[0] = sx * n_rows + sy
+    start, end = 0, 1
+    while start < end:
+        x, y = divmod(queue[start], n_rows)
+        start += 1
+        for k in range(4):
+            nx, ny = x + DX[k], y + DY[k]
+            if nx == tx and ny == ty:
+                distances[nx, ny] = distances[x, y] + 1
+                return True
+            if (
+                0 <= nx < n_cols
+                and 0 <= ny < n_rows
+                and free[nx, ny]
+                and distances[nx, ny] < 0
+            ):
+                distances[nx, ny] = distances[x, y] + 1
+                queue[end] = nx * n_rows + ny
+                end += 1
+    return False
+
+
+if njit is not None:
+    _search = njit(cache=True)(_search)
+
+
+def distance_field(blocked, source, out=None):
+    """Breadth-first search distances from `source` to every grid cell.
+
+    Args:
+        blocked: Boolean grid of shape (columns, rows), True for cells that
+            cannot be entered
+        source: (cx, cy) cell the search starts from, entered even if blocked
+        out: int32 array of the grid's shape to write the distances into,
+            allocated if None
+
+    Returns:
+        np.array: Step counts, -1 where the source is unreachable
+    """
+    if out is None:
+        out = np.empty(blocked.shape, dtype=np.int32)
+    _search(~blocked, source[0], source[1], -1, -1, out)
+    return out
+
+
+class ExpertPlanner:
+    """Greedy shortest-path Snake player that keeps its tail reachable.
+
+    Moves follow a BFS distance field grown from the food around the body.
+    The body only advances along cells the head has already left, so the
+    field is reused while the food has not moved and is recomputed only when
+    it moves or when no move towards the food is safe. A move is safe when,
+    after making it, the head can still reach the tail, which leaves the
+    snake an escape route by following its tail.
+    """
+
+    def __init__(self):
+        self._food = None
+        self._field = None
+        self._fresh = False
+        self._scratch = None
+
+        # Metrics
+        self.searches = 0
+
+    def _refresh(self, occupancy, food):
+        if self._scratch is None or self._scratch.shape != occupancy.shape:
+            self._scratch = np.empty(occupancy.shape, dtype=np.int32)
+            self._field = np.empty(occupancy.shape, dtype=np.int32)
+        distance_field(occupancy > 0, food, out=self._field)
+        self._food = food
+        self._fresh = True
+        self.searches += 1
+
+    def _is_safe(self, player, cell, food):
+        body = player.body
+        # Snakes shorter than five cells cannot enclose their own head
+        if len(body) < 5:
+            return True
+        size = player.size
+        tail = body[-1].x // size, body[-1].y // size
+        free = player.occupancy == 0
+        # Moving frees the old tail cell, even when eating: the snake grows
+        # by doubling the segment before it once the tail has moved. Keeping
+        # the cell blocked when `cell` is the food is only conservative.
+        if cell != food and player.occupancy[tail] == 1:
+            free[tail] = True
+        free[cell] = False
+        new_tail = body[-2].x // size, body[-2].y // size
+        return _search(free, *cell, *new_tail, self._scratch)
+
+    def act(self, game):
+        """Choose the next action for `game`'s snake."""
+        player = game.player
+        size = player.size
+        head = player.head.x // size, player.head.y // size
+        food = game.food.x // size, game.food.y // size
+        if food != self._food:
+            self._refresh(player.occupancy, food)
+        else:
+            self._fresh = False
+
+        reverse = REVERSE[ACTIONS[player.direction]]
+        moves = []
+        for action, (dx, dy) in enumerate(STEPS):
+            cell = head[0] + dx, head[1] + dy
+            if action != reverse and not player.is_blocked(*cell):
+                moves.append((action, cell))
+        if not moves:
+            # Boxed in, every move is fatal
+            return ACTIONS[player.direction]
+
+        while True:
+            # Unreachable cells sort after reachable ones
+            ranked = sorted(
+                moves,
+                key=lambda move: (self._field[move[1]] < 0, self._field[move[1]]),
+            )
+            for action, cell in ranked:
+                if self._field[cell] >= 0 and self._is_safe(player, cell, food):
+                    return action
+            if self._fresh:
+                break
+            self._refresh(player.occupancy, food)
+
+        # No safe way towards the food, so stall on any safe move instead
+        for action, cell in moves:
+            if self._is_safe(player, cell, food):
+                return action
+        return moves[0][0]
+
+
+def play(env, n_transitions, bins=BINS, planner=None):
+    """Collect expert transitions from `env`.
+
+    Args:
+        env: SnakeEnv to play, reset at the start of every episode
+        n_transitions: Number of transitions to collect
+        bins: Bin counts for `train.discretize` (coords mode only)
+        planner: ExpertPlanner to act with, a new one if None
+
+    Returns:
+        dict: Arrays of discrete states, actions, rewards, next_states and
+            dones
+    """
+    planner = planner or ExpertPlanner()
+
+    def to_state(obs):
+        if env.obs_mode == "danger":
+            return obs.tolist()
+        return discretize(obs, bins, env.width, env.height)
+
+    states, actions, rewards, next_states, dones = [], [], [], [], []
+    obs, _ = env.reset()
+    state = to_state(obs)
+    while len(actions) < n_transitions:
+        action = planner.act(env.game)
+        obs, reward, terminated, truncated, _ = env.step(action)
+        next_state = to_state(obs)
+
+        states.append(state)
+        actions.append(action)
+        rewards.append(reward)
+        next_states.append(next_state)
+        dones.append(terminated)
+
+        state = next_state
+        if terminated or truncated:
+            obs, _ = env.reset()
+            state = to_state(obs)
+
+    return {
+        "states": np.array(states, dtype=np.int16),
+        "actions": np.array(actions, dtype=np.int8),
+        "rewards": np.array(rewards, dtype=np.float32),
+        "next_states": np.array(next_states, dtype=np.int16),
+        "dones": np.array(dones, dtype=bool),
+    }
+
+
+def _play_worker(n_transitions, seed, env_kwargs, bins):
+    # Game positions come from the `random` module
+    random.seed(seed)
+    env = SnakeEnv(**env_kwargs)
+    demos = play(env, n_transitions, bins)
+    env.close()
+    return demos
+
+
+def generate(n_transitions, workers=None, seed=0, bins=BINS, **env_kwargs):
+    """Play expert games in parallel processes.
+
+    Args:
+        n_transitions: Total number of transitions to collect
+        workers: Number of processes, os.cpu_count() if None
+        seed: Base seed, each process uses seed + its index
+        bins: Bin counts for `train.discretize` (coords mode only)
+        **env_kwargs: Passed to SnakeEnv
+
+    Returns:
+        dict: Concatenated arrays as returned by `play`
+    """
+    workers = workers or os.cpu_count()
+    shares = [n_transitions // workers] * workers
+    shares[0] += n_transitions - sum(shares)
+    jobs = [(share, seed + i, env_kwargs, bins) for i, share in enumerate(shares)]
+
+    pool = mp.get_context("spawn").Pool(workers)
+    try:
+        parts = pool.starmap(_play_worker, jobs)
+    finally:
+        pool.close()
+        pool.join()
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def seed_q_table(demos, n_actions, alpha=0.1, gamma=0.99, passes=1, margin=1.0):
+    """Build a Q-table for `train` from expert demonstrations.
+
+    Q-learning updates are replayed over the demonstrations, and `margin` is
+    added to each demonstrated action so the greedy policy imitates the
+    expert on every state it visited.
+
+    Returns:
+        defaultdict: Discrete state tuple -> Q-values
+    """
+    q_table = defaultdict(partial(np.zeros, n_actions))
+    states = list(map(tuple, demos["states"].tolist()))
+    next_states = list(map(tuple, demos["next_states"].tolist()))
+    transitions = list(
+        zip(
+            states,
+            demos["actions"].tolist(),
+            demos["rewards"].tolist(),
+            next_states,
+            demos["dones"].tolist(),
+        )
+    )
+    for _ in range(passes):
+        for s, a, r, s_next, done in transitions:
+            best_next = 0.0 if done else np.max(q_table[s_next])
+            q = q_table[s]
+            q[a] += alpha * (r + gamma * best_next - q[a])
+
+    for s, a in zip(states, demos["actions"].tolist()):
+        q = q_table[s]
+        if np.argmax(q) != a:
+            q[a] = np.max(q) + margin
+    return q_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expert Snake demonstrations")
+    parser.add_argument("--transitions", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--obs-mode", choices=["danger", "coords"], default="danger")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="snake_demos.npz")
+    parser.add_argument(
+        "--train-episodes",
+        type=int,
+        default=0,
+        help="Q-learning episodes to run from the seeded table afterwards",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    demos = generate(
+        args.transitions, workers=args.workers, seed=args.seed, obs_mode=args.obs_mode
+    )
+    elapsed = time.perf_counter() - start
+    np.savez_compressed(args.output, **demos)
+    print(
+        f"Wrote {len(demos['actions'])} transitions to {args.output} in "
+        f"{elapsed:.1f}s ({len(demos['actions']) / elapsed:,.0f}/s), "
+        f"{int(demos['dones'].sum())} deaths, mean reward {demos['rewards'].mean():.3f}"
+    )
+
+    if args.train_episodes:
+        env = SnakeEnv(obs_mode=args.obs_mode)
+        q_table = seed_q_table(demos, env.action_space.n)
+        train(env, args.train_episodes, epsilon=0.05, q_table=q_table)
+        env.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
+import argparse
+import gc
 import os
 import pygame
 import random
 import time
+import tracemalloc
 import numpy as np
 
 from constants import GREEN, BLACK, WHITE, SIZE, WIDTH, HEIGHT, FPS
@@ -10,16 +13,56 @@ pygame.init()
 
 
 class Snake:
-    def __init__(self, x, y):
+    __slots__ = (
+        "size",
+        "width",
+        "height",
+        "is_alive",
+        "body",
+        "vel",
+        "direction",
+        "next_direction",
+        "occupancy",
+    )
+
+    def __init__(self, x, y, size=SIZE, width=WIDTH, height=HEIGHT):
+        self.size = size
+        self.width = width
+        self.height = height
         self.is_alive = True
-        self.body = [pygame.Rect(x, y, SIZE, SIZE)]
-        self.vel = SIZE
+        self.body = [pygame.Rect(x, y, size, size)]
+        self.vel = size
         self.direction = "right"
         self.next_direction = "right"
 
+        # Number of body segments on each grid cell, kept in sync with self.body
+        self.occupancy = np.zeros((width // size, height // size), dtype=np.int8)
+        self._mark(self.body[0], 1)
+
+    def _mark(self, rect, delta):
+        cx, cy = rect.x // self.size, rect.y // self.size
+        if 0 <= cx < self.occupancy.shape[0] and 0 <= cy < self.occupancy.shape[1]:
+            self.occupancy[cx, cy] += delta
+
+    def is_blocked(self, cx, cy):
+        """Whether moving the head onto grid cell (cx, cy) next step is fatal."""
+        if not (
+            0 <= cx < self.occupancy.shape[0] and 0 <= cy < self.occupancy.shape[1]
+        ):
+            return True
+        count = self.occupancy[cx, cy]
+        if count == 0:
+            return False
+        # The tail moves out of the way unless the snake has just eaten
+        tail = self.body[-1]
+        return not (
+            count == 1 and tail.x // self.size == cx and tail.y // self.size == cy
+        )
+
     def eat(self):
         tail = self.body[-1]
-        self.body.append(pygame.Rect(tail.x, tail.y, SIZE, SIZE))
+        self.body.append(pygame.Rect(tail.x, tail.y, self.size, self.size))
+        self._mark(tail, 1)
 
     def move(self):
         if (
@@ -30,51 +73,68 @@ class Snake:
         ):
             self.direction = self.next_direction
 
-        # Calculate new head position
-        head = self.body[0].copy()
+        # Move the tail rect to the new head position rather than allocating
+        x, y = self.body[0].topleft
+        head = self.body.pop()
+        self._mark(head, -1)
         if self.direction == "up":
-            head.y -= self.vel
+            y -= self.vel
         elif self.direction == "down":
-            head.y += self.vel
+            y += self.vel
         elif self.direction == "right":
-            head.x += self.vel
+            x += self.vel
         elif self.direction == "left":
-            head.x -= self.vel
-
-        # Insert new head and remove tail
+            x -= self.vel
+        head.topleft = x, y
         self.body.insert(0, head)
-        self.body.pop()
+        self._mark(head, 1)
 
         # Check for boundary collisions
-        if head.x < 0 or head.x + SIZE > WIDTH or head.y < 0 or head.y + SIZE > HEIGHT:
+        if (
+            head.x < 0
+            or head.x + self.size > self.width
+            or head.y < 0
+            or head.y + self.size > self.height
+        ):
             self.is_alive = False
-
         # Check for self collision
-        for segment in self.body[1:]:
-            if head.colliderect(segment):
-                self.is_alive = False
-                break
+        elif self.occupancy[head.x // self.size, head.y // self.size] > 1:
+            self.is_alive = False
 
     @property
     def head(self):
         return self.body[0]
 
     def clear(self):
-        self.body = [pygame.Rect(self.head.x, self.head.y, SIZE, SIZE)]
+        del self.body[1:]
+        self.occupancy.fill(0)
+        self._mark(self.body[0], 1)
         self.is_alive = True
         self.direction = "right"
         self.next_direction = "right"
 
+    def respawn(self, x, y):
+        """Start over as a single segment at (x, y), reusing this object."""
+        self.head.topleft = x, y
+        self.clear()
+
     def render(self, screen):
         for block in self.body:
             pygame.draw.rect(screen, GREEN, block)
 
 
 class Food:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "rect")
+
+    def __init__(self, x, y, size=SIZE):
+        self.x = x
+        self.y = y
+        self.rect = pygame.Rect(x, y, size, size)
+
+    def move_to(self, x, y):
         self.x = x
         self.y = y
-        self.rect = pygame.Rect(x, y, SIZE, SIZE)
+        self.rect.topleft = x, y
 
     def render(self, screen):
         pygame.draw.rect(screen, WHITE, self.rect)
@@ -84,7 +144,32 @@ class Food:
 
 
 class Game:
-    def __init__(self, title="Snake", render_ui=True, record=False):
+    __slots__ = (
+        "width",
+        "height",
+        "size",
+        "score",
+        "is_running",
+        "clock",
+        "render_ui",
+        "record",
+        "player",
+        "food",
+        "screen",
+    )
+
+    def __init__(
+        self,
+        title="Snake",
+        render_ui=True,
+        record=False,
+        width=WIDTH,
+        height=HEIGHT,
+        size=SIZE,
+    ):
+        self.width = width
+        self.height = height
+        self.size = size
         self.score = 0
         self.is_running = True
         self.clock = pygame.time.Clock()
@@ -92,28 +177,38 @@ class Game:
         self.record = record
 
         x, y = self._random_pos()
-        self.player = Snake(x, y)
+        self.player = Snake(x, y, self.size, self.width, self.height)
 
         x, y = self._random_pos()
-        self.food = Food(x, y)
+        self.food = Food(x, y, self.size)
 
         if self.render_ui:
-            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            self.screen = pygame.display.set_mode((self.width, self.height))
             pygame.display.set_caption(title)
 
     def _random_pos(self):
         return (
-            random.randrange(0, WIDTH, SIZE),
-            random.randrange(0, HEIGHT, SIZE),
+            random.randrange(0, self.width, self.size),
+            random.randrange(0, self.height, self.size),
         )
 
     def _reset(self):
+        # Entities are updated in place, so resets allocate nothing
         x, y = self._random_pos()
-        self.food = Food(x, y)
+        self.food.move_to(x, y)
 
         if not self.player.is_alive:
             x, y = self._random_pos()
-            self.player = Snake(x, y)
+            self.player.respawn(x, y)
+
+    def _spawn_food(self):
+        """Move the food to a random cell the snake does not occupy."""
+        free = np.flatnonzero(self.player.occupancy == 0)
+        if not len(free):
+            return
+        cell = int(free[random.randrange(len(free))])
+        cx, cy = divmod(cell, self.player.occupancy.shape[1])
+        self.food.move_to(cx * self.size, cy * self.size)
 
     def _render(self):
         if self.render_ui:
@@ -130,8 +225,7 @@ class Game:
         self.player.next_direction = val
 
     def _collision_check(self):
-        x, y = self.food.get_pos()
-        return self.player.head.collidepoint(x, y)
+        return self.player.head.collidepoint(self.food.x, self.food.y)
 
     def end(self):
         pygame.quit()
@@ -159,13 +253,66 @@ class Game:
 
             if self._collision_check():
                 self.player.eat()
-                self._reset()
+                self._spawn_food()
             self._render()
             self._record()
 
         self.end()
 
 
-if __name__ == "__main__":
+def bench(n_games=1000, steps=200):
+    """Measure headless games driven by random key presses.
+
+    Returns:
+        dict: Traced bytes per game, microseconds per game step and garbage
+            collections run while stepping
+    """
+    gc.collect()
+    tracemalloc.start()
+    games = [Game(render_ui=False) for _ in range(n_games)]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    directions = ["up", "down", "left", "right"]
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    start = time.perf_counter()
+    for _ in range(steps):
+        for game in games:
+            game._handle_input(random.choice(directions))
+            game.player.move()
+            if game._collision_check():
+                game.player.eat()
+                game._reset()
+            elif not game.player.is_alive:
+                game._reset()
+    elapsed = time.perf_counter() - start
+    return {
+        "bytes_per_game": memory / n_games,
+        "us_per_step": elapsed / (n_games * steps) * 1e6,
+        "gc_collections": sum(stats["collections"] for stats in gc.get_stats())
+        - collections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snake")
+    parser.add_argument(
+        "--bench", type=int, metavar="N", help="time N headless games instead"
+    )
+    args = parser.parse_args()
+
+    if args.bench:
+        results = bench(args.bench)
+        print(
+            f"{results['bytes_per_game']:,.0f} bytes per game, "
+            f"{results['us_per_step']:.2f} us per step, "
+            f"{results['gc_collections']} garbage collections"
+        )
+        return
+
     game = Game()
     game.start()
+
+
+if __name__ == "__main__":
+    main()
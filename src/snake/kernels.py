@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+import time
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Batched Snake transition kernels on plain arrays, mirroring Snake.move and
+# the food check in SnakeEnv.step. Positions are grid cells, directions use
+# the action encoding 0=up, 1=down, 2=left, 3=right, and each body is a ring
+# buffer: segment k of env i is at (head[i] + k) % capacity. Eaten food moves
+# to free cell int(draws[i] * n_free) in x-major order, so both backends
+# respawn it identically from the same uniform draws in [0, 1).
+DX = np.array([0, 0, -1, 1], dtype=np.int64)
+DY = np.array([-1, 1, 0, 0], dtype=np.int64)
+OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int64)
+
+
+def make_state(n_envs, n_cols, n_rows, rng):
+    """Batch of single-segment snakes and food at random cells."""
+    capacity = n_cols * n_rows + 1
+    state = {
+        "body_x": np.zeros((n_envs, capacity), dtype=np.int64),
+        "body_y": np.zeros((n_envs, capacity), dtype=np.int64),
+        "head": np.zeros(n_envs, dtype=np.int64),
+        "length": np.ones(n_envs, dtype=np.int64),
+        "direction": np.full(n_envs, 3, dtype=np.int64),
+        "alive": np.ones(n_envs, dtype=bool),
+        "occupancy": np.zeros((n_envs, n_cols, n_rows), dtype=np.int16),
+        "food_x": rng.integers(0, n_cols, n_envs),
+        "food_y": rng.integers(0, n_rows, n_envs),
+    }
+    state["body_x"][:, 0] = rng.integers(0, n_cols, n_envs)
+    state["body_y"][:, 0] = rng.integers(0, n_rows, n_envs)
+    state["occupancy"][
+        np.arange(n_envs), state["body_x"][:, 0], state["body_y"][:, 0]
+    ] = 1
+    return state
+
+
+def step_numpy(
+    actions,
+    draws,
+    body_x,
+    body_y,
+    head,
+    length,
+    direction,
+    alive,
+    occupancy,
+    food_x,
+    food_y,
+):
+    """Advance every live snake one step in place.
+
+    Returns:
+        np.array: Whether each snake's head landed on its food
+    """
+    envs = np.flatnonzero(alive)
+    capacity = body_x.shape[1]
+    n_cols, n_rows = occupancy.shape[1:]
+
+    # Reversing into the body is ignored
+    turn = actions[envs] != OPPOSITE[direction[envs]]
+    direction[envs[turn]] = actions[envs[turn]]
+
+    old_head = head[envs]
+    x = body_x[envs, old_head] + DX[direction[envs]]
+    y = body_y[envs, old_head] + DY[direction[envs]]
+    new_head = (old_head - 1) % capacity
+    tail = (old_head + length[envs] - 1) % capacity
+    head[envs] = new_head
+    body_x[envs, new_head] = x
+    body_y[envs, new_head] = y
+
+    inside = (x >= 0) & (x < n_cols) & (y >= 0) & (y < n_rows)
+    occupancy[envs[inside], x[inside], y[inside]] += 1
+    tail_x, tail_y = body_x[envs, tail], body_y[envs, tail]
+    tail_inside = (tail_x >= 0) & (tail_x < n_cols) & (tail_y >= 0) & (tail_y < n_rows)
+    occupancy[envs[tail_inside], tail_x[tail_inside], tail_y[tail_inside]] -= 1
+
+    crashed = ~inside
+    crashed[inside] = occupancy[envs[inside], x[inside], y[inside]] > 1
+    alive[envs[crashed]] = False
+
+    ate = np.zeros(len(alive), dtype=bool)
+    eats = (x == food_x[envs]) & (y == food_y[envs])
+    ate[envs[eats]] = True
+
+    # Eating duplicates the tail segment, like Snake.eat
+    grow = envs[eats]
+    last = (head[grow] + length[grow] - 1) % capacity
+    new_tail = (last + 1) % capacity
+    body_x[grow, new_tail] = body_x[grow, last]
+    body_y[grow, new_tail] = body_y[grow, last]
+    occupancy[grow, body_x[grow, last], body_y[grow, last]] += 1
+    length[grow] += 1
+
+    # Respawn the eaten food on a free cell, unless the board is full
+    free = occupancy[grow].reshape(len(grow), n_cols * n_rows) == 0
+    n_free = free.sum(axis=1)
+    pick = (draws[grow] * n_free).astype(np.int64)
+    cell = np.argmax(np.cumsum(free, axis=1) > pick[:, None], axis=1)
+    spawn = n_free > 0
+    food_x[grow[spawn]] = cell[spawn] // n_rows
+    food_y[grow[spawn]] = cell[spawn] % n_rows
+    return ate
+
+
+def _step_loop(
+    actions,
+    draws,
+    body_x,
+    body_y,
+    head,
+    length,
+    direction,
+    alive,
+    occupancy,
+    food_x,
+    food_y,
+):
+    capacity = body_x.shape[1]
+    n_cols, n_rows = occupancy.shape[1], occupancy.shape[2]
+    ate = np.zeros(alive.shape[0], dtype=np.bool_)
+    for i in range(alive.shape[0]):
+        if not alive[i]:
+            continue
+        if actions[i] != OPPOSITE[direction[i]]:
+            direction[i] = actions[i]
+
+        x = body_x[i, head[i]] + DX[direction[i]]
+        y = body_y[i, head[i]] + DY[direction[i]]
+        tail = (head[i] + length[i] - 1) % capacity
+        head[i] = (head[i] - 1) % capacity
+        body_x[i, head[i]] = x
+        body_y[i, head[i]] = y
+
+        inside = 0 <= x < n_cols and 0 <= y < n_rows
+        if inside:
+            occupancy[i, x, y] += 1
+        tail_x, tail_y = body_x[i, tail], body_y[i, tail]
+        if 0 <= tail_x < n_cols and 0 <= tail_y < n_rows:
+            occupancy[i, tail_x, tail_y] -= 1
+
+        if not inside or occupancy[i, x, y] > 1:
+            alive[i] = False
+
+        if x == food_x[i] and y == food_y[i]:
+            ate[i] = True
+            last = (head[i] + length[i] - 1) % capacity
+            new_tail = (last + 1) % capacity
+            body_x[i, new_tail] = body_x[i, last]
+            body_y[i, new_tail] = body_y[i, last]
+            occupancy[i, body_x[i, last], body_y[i, last]] += 1
+            length[i] += 1
+
+            n_free = 0
+            for cx in range(n_cols):
+                for cy in range(n_rows):
+                    if occupancy[i, cx, cy] == 0:
+                        n_free += 1
+            pick = int(draws[i] * n_free)
+            for cx in range(n_cols):
+                for cy in range(n_rows):
+                    if occupancy[i, cx, cy] == 0:
+                        if pick == 0:
+                            food_x[i] = cx
+                            food_y[i] = cy
+                        pick -= 1
+    return ate
+
+
+step_numba = njit(cache=True)(_step_loop) if njit is not None else None
+
+# Fastest available backend
+step = step_numba if step_numba is not None else step_numpy
+
+
+def check_parity(n_envs=64, n_steps=500, n_cols=20, n_rows=15, seed=0):
+    """Run both backends from the same seed and check the trajectories match."""
+    if step_numba is None:
+        raise RuntimeError("Numba is not installed")
+    states = [make_state(n_envs, n_cols, n_rows, np.random.default_rng(seed))]
+    states.append({k: v.copy() for k, v in states[0].items()})
+    rng = np.random.default_rng(seed + 1)
+    for _ in range(n_steps):
+        actions = rng.integers(0, 4, n_envs)
+        draws = rng.random(n_envs)
+        ate = [
+            backend(actions, draws, **s)
+            for backend, s in zip((step_numpy, step_numba), states)
+        ]
+        assert np.array_equal(*ate), "ate differs"
+        for key in states[0]:
+            assert np.array_equal(states[0][key], states[1][key]), f"{key} differs"
+
+
+def main():
+    rng = np.random.default_rng(0)
+    backends = [("numpy", step_numpy)]
+    if step_numba is not None:
+        check_parity()
+        print("Parity check passed")
+        backends.append(("numba", step_numba))
+
+    for name, backend in backends:
+        state = make_state(1024, 80, 60, rng)
+        actions = rng.integers(0, 4, 1024)
+        draws = rng.random(1024)
+        start = time.perf_counter()
+        for _ in range(200):
+            backend(actions, draws, **state)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {1024 * 200 / elapsed:,.0f} env steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The game directories are run as flat scripts; this puts src/ on the path so
+# they can import the code both games share from the `common` package
+SRC = str(Path(__file__).resolve().parent.parent)
+if SRC not in sys.path:
+    sys.path.append(SRC)
@@ -0,0 +1,47 @@
+import numpy as np
+
+import paths  # noqa: F401
+from common.policy import Policy as BasePolicy
+
+
+class Policy(BasePolicy):
+    """Greedy policy compiled from a Q-table trained by `train.py`."""
+
+    @classmethod
+    def from_training(cls, q_table, env, bins=None):
+        """Compile a Q-table trained by `train.py` on observations from `env`.
+
+        Args:
+            q_table: Mapping of discrete state to Q-values
+            env: The SnakeEnv the table was trained on
+            bins: Bin counts passed to `train.discretize` (coords mode only)
+        """
+        obs_dim = env.observation_space.shape[0]
+        if env.obs_mode == "danger":
+            # Binary features are used as the state directly
+            return cls.from_q_table(
+                q_table,
+                obs_dim=obs_dim,
+                columns=range(obs_dim),
+                edges=[[0.5]] * obs_dim,
+                offsets=[0] * obs_dim,
+                right=[False] * obs_dim,
+            )
+
+        width, height = env.width, env.height
+        return cls.from_q_table(
+            q_table,
+            obs_dim=obs_dim,
+            columns=range(obs_dim),
+            edges=[
+                np.linspace(-width, width, bins[0]),
+                np.linspace(-height, height, bins[1]),
+                np.linspace(0, width, bins[2]),
+                np.linspace(0, height, bins[3]),
+                np.linspace(0, width, bins[2]),
+                np.linspace(0, height, bins[3]),
+                np.linspace(0, 3, bins[4]),
+            ],
+            offsets=[0] * obs_dim,
+            right=[False] * obs_dim,
+        )
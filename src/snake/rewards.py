@@ -0,0 +1,96 @@
+import numpy as np
+
+import paths  # noqa: F401
+from common.rewards import RewardFunction as BaseRewardFunction, RewardTerms
+
+# Reward terms read a per-step event record, a dict with:
+#   ate: the head reached the food
+#   died: the snake hit a wall or itself
+#   length: body length after moving, before growing
+#   dist, prev_dist: squared pixel distance from head to food after and
+#       before the move (equal on the first step of an episode)
+#   max_distance: squared diagonal of the board
+REWARD_TERMS = RewardTerms()
+reward_term = REWARD_TERMS.register
+
+
+def _shaping(events):
+    # Shaping only applies on steps that neither eat nor die
+    return (1 - events["ate"]) * (1 - events["died"])
+
+
+@reward_term("food")
+def food(events):
+    return 10.0 * events["ate"]
+
+
+@reward_term("death")
+def death(events):
+    return -10.0 * events["died"] * (1 - events["ate"])
+
+
+@reward_term("step")
+def step(events):
+    return -0.01 * _shaping(events)
+
+
+@reward_term("length")
+def length(events):
+    return 0.1 * (events["length"] - 1) * _shaping(events)
+
+
+@reward_term("approach")
+def approach(events):
+    closer = 0.1 * (events["prev_dist"] - events["dist"])
+    return closer / (events["max_distance"] + 1e-8) * _shaping(events)
+
+
+# SnakeEnv's original reward
+DEFAULT_WEIGHTS = {
+    "food": 1.0,
+    "death": 1.0,
+    "step": 1.0,
+    "length": 1.0,
+    "approach": 1.0,
+}
+
+
+class RewardFunction(BaseRewardFunction):
+    """Weighted sum of Snake's reward terms."""
+
+    terms = REWARD_TERMS
+    default_weights = DEFAULT_WEIGHTS
+
+
+def kernel_events(state, ate, died, prev_dist, size):
+    """Event record for a batch of games stepped with `kernels.step`.
+
+    Args:
+        state: Kernel state arrays after the step
+        ate: Array returned by the step
+        died: Games that were alive before the step and are not anymore
+        prev_dist: Squared pixel distances before the step
+        size: Cell size in pixels
+
+    Returns:
+        dict: Batched event record
+    """
+    n_envs = len(state["head"])
+    head_x = state["body_x"][np.arange(n_envs), state["head"]]
+    head_y = state["body_y"][np.arange(n_envs), state["head"]]
+    n_cols, n_rows = state["occupancy"].shape[1:]
+    length = state["length"] - ate
+    return {
+        "ate": ate.astype(np.int64),
+        "died": died.astype(np.int64),
+        "length": length,
+        # Eaten food has already respawned, but the head is on the cell it left
+        "dist": np.where(
+            ate,
+            0,
+            ((head_x - state["food_x"]) ** 2 + (head_y - state["food_y"]) ** 2)
+            * size**2,
+        ),
+        "prev_dist": prev_dist,
+        "max_distance": ((n_cols - 1) ** 2 + (n_rows - 1) ** 2) * size**2,
+    }
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+
+import paths  # noqa: F401
+from common.server import main
+
+if __name__ == "__main__":
+    main("Serve a compiled Snake policy")
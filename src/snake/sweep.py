@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+import paths  # noqa: F401
+from common.sweep import main
+from env import SnakeEnv
+from train import train
+
+# Each hyperparameter maps to a list of choices or a (low, high) range that is
+# sampled log-uniformly. In a JSON search space a range is {"low": .., "high": ..}.
+SEARCH_SPACE = {
+    "obs_mode": ["danger", "coords"],
+    "alpha": (0.01, 0.5),
+    "gamma": [0.9, 0.95, 0.99],
+    "epsilon_min": [0.01, 0.05, 0.1],
+    "epsilon_decay": [0.99, 0.995, 0.999],
+    "bins": [[15, 15, 10, 10, 10, 10, 4], [8, 8, 5, 5, 5, 5, 4]],
+}
+
+
+def _run_trial(config, state, episodes):
+    config = dict(config)
+    env = SnakeEnv(obs_mode=config.pop("obs_mode", "coords"))
+    q_table, epsilon = state or (None, 1.0)
+    q_table, rewards, epsilon = train(
+        env, episodes, epsilon=epsilon, q_table=q_table, verbose=False, **config
+    )
+    env.close()
+    return (q_table, epsilon), rewards
+
+
+if __name__ == "__main__":
+    main(_run_trial, SEARCH_SPACE, "Snake hyperparameter sweep", "snake_sweep.csv")
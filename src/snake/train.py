@@ -1,79 +1,231 @@
+import argparse
 import gymnasium as gym
 from env import SnakeEnv
+from policy import Policy
+import paths  # noqa: F401
+from common.evaluator import AsyncEvaluator
+from common.tiles import TileCoder, TileQ
+from common.traces import ArrayQTable, EligibilityTraces, NStepWindow
 import numpy as np
-import pygame
 from collections import defaultdict
+from functools import partial
 
+# Default discretization bins for each obs dim (coords observations)
+BINS = [15, 15, 10, 10, 10, 10, 4]
 
-def discretize(obs, bins):
+# Learning rules accepted by train(update=...)
+UPDATES = ("one_step", "n_step", "watkins")
+
+
+def discretize(obs, bins, width=800, height=600):
     # obs: [rel_food_x, rel_food_y, food_x, food_y, head_x, head_y, direction]
     # bins: list of bin counts for each dimension
+    # width, height: board size the positions are spread over
     bin_ranges = [
-        np.linspace(-800, 800, bins[0]),  # rel_food_x
-        np.linspace(-600, 600, bins[1]),  # rel_food_y
-        np.linspace(0, 800, bins[2]),  # food_x
-        np.linspace(0, 600, bins[3]),  # food_y
-        np.linspace(0, 800, bins[2]),  # head_x
-        np.linspace(0, 600, bins[3]),  # head_y
+        np.linspace(-width, width, bins[0]),  # rel_food_x
+        np.linspace(-height, height, bins[1]),  # rel_food_y
+        np.linspace(0, width, bins[2]),  # food_x
+        np.linspace(0, height, bins[3]),  # food_y
+        np.linspace(0, width, bins[2]),  # head_x
+        np.linspace(0, height, bins[3]),  # head_y
         np.linspace(0, 3, bins[4]),  # direction (0,1,2,3)
     ]
     return tuple(int(np.digitize(o, r)) for o, r in zip(obs, bin_ranges))
 
 
-def main():
+def train(
+    env,
+    num_episodes,
+    alpha=0.1,
+    gamma=0.99,
+    epsilon=1.0,
+    epsilon_min=0.05,
+    epsilon_decay=0.995,
+    bins=BINS,
+    q_table=None,
+    verbose=True,
+    update="one_step",
+    n_step=3,
+    lam=0.9,
+    evaluator=None,
+    eval_interval=50,
+):
+    """Run epsilon-greedy tabular Q-learning on `env`.
+
+    Passing back the returned q_table and epsilon continues a previous run.
+    `q_table` may also be a TileQ, which learns over hashed tiles of the raw
+    observations instead of discretized states.
+
+    `update` picks the learning rule: "one_step" Q-learning, "n_step"
+    returns over `n_step` rewards, or Watkins Q(lambda) ("watkins") with
+    eligibility traces that decay by gamma * lam and are cut after
+    exploratory actions. Both multi-step rules spread a reward back over
+    many states per env step and keep the table in an ArrayQTable.
+
+    With an AsyncEvaluator, a snapshot of the greedy policy is handed to it
+    every `eval_interval` episodes and evaluated while training continues.
+
+    With a "viewer" env, closing the viewer window stops training early.
+
+    Returns:
+        tuple: (q_table, episode_rewards, epsilon)
+    """
+    if update not in UPDATES:
+        raise ValueError(f"Unknown update: {update!r}")
 
-    env = SnakeEnv(render_mode="human")
-    num_episodes = 1_000
-    alpha = 0.1  # learning rate
-    gamma = 0.99  # discount factor
-    epsilon = 1.0  # exploration rate
-    epsilon_min = 0.05
-    epsilon_decay = 0.995
-    bins = [
-        15,
-        15,
-        10,
-        10,
-        10,
-        10,
-        4,
-    ]  # discretization bins for each obs dim
-    q_table = defaultdict(lambda: np.zeros(env.action_space.n))
+    tiled = isinstance(q_table, TileQ)
+    if tiled and update != "one_step":
+        raise ValueError("Multi-step updates need a tabular q_table")
+
+    if update != "one_step":
+        if q_table is None:
+            q_table = ArrayQTable(env.action_space.n)
+        elif not isinstance(q_table, ArrayQTable):
+            q_table = ArrayQTable.from_dict(q_table, env.action_space.n)
+    elif q_table is None:
+        q_table = defaultdict(partial(np.zeros, env.action_space.n))
+
+    window = NStepWindow(n_step, gamma)
+    traces = EligibilityTraces()
+
+    def to_state(obs):
+        if tiled:
+            return obs
+        if env.obs_mode == "danger":
+            return tuple(obs.tolist())
+        return discretize(obs, bins, env.width, env.height)
+
+    def greedy(obs):
+        # Called in the evaluator's forked child, on its copy of q_table
+        return int(np.argmax(q_table[to_state(obs)]))
+
+    episode_rewards = []
+    training_interrupted = False
+    watch_viewer = env.render_mode == "viewer"
+    if watch_viewer and verbose:
+        print("Close the viewer window to stop training early.")
 
     for episode in range(num_episodes):
         obs, info = env.reset()
-        state = discretize(obs, bins)
+        state = to_state(obs)
         done = False
         total_reward = 0
         steps = 0
+        window.clear()
+        traces.clear()
         while not done:
+            # Stop if the viewer window was closed
+            if watch_viewer and not env.viewer.is_open():
+                training_interrupted = True
+                break
+
             # Epsilon-greedy action selection
             if np.random.rand() < epsilon:
                 action = env.action_space.sample()
+                # Watkins' Q(lambda) only credits the greedy policy's past
+                if action != np.argmax(q_table[state]):
+                    traces.clear()
             else:
                 action = np.argmax(q_table[state])
 
             obs, reward, terminated, truncated, info = env.step(action)
             env.render()
-            pygame.event.pump()
-            next_state = discretize(obs, bins)
+            next_state = to_state(obs)
+            done = terminated or truncated
 
             # Q-learning update
             best_next = np.max(q_table[next_state])
-            q_table[state][action] += alpha * (
-                reward + gamma * best_next - q_table[state][action]
-            )
+            if tiled:
+                q_table.update(state, action, reward + gamma * best_next, alpha)
+            elif update == "n_step":
+                window.append(state, action, reward)
+                for s, a, target in window.targets(best_next, flush=done):
+                    q_table[s][a] += alpha * (target - q_table[s][a])
+            elif update == "watkins":
+                td_error = reward + gamma * best_next - q_table[state][action]
+                traces.visit(q_table.state_id(state), action)
+                traces.update(q_table.q, alpha * td_error)
+                traces.decay(gamma * lam)
+            else:
+                q_table[state][action] += alpha * (
+                    reward + gamma * best_next - q_table[state][action]
+                )
 
             state = next_state
             total_reward += reward
             steps += 1
-            done = terminated or truncated
 
+        if training_interrupted:
+            print(f"\nTraining interrupted by user at episode {episode + 1}")
+            break
+
+        episode_rewards.append(total_reward)
         epsilon = max(epsilon * epsilon_decay, epsilon_min)
-        print(
-            f"Episode {episode+1}: Total Reward = {total_reward:.2f}, Steps = {steps}, Epsilon = {epsilon:.3f}"
-        )
+        if verbose:
+            print(
+                f"Episode {episode+1}: Total Reward = {total_reward:.2f}, Steps = {steps}, Epsilon = {epsilon:.3f}"
+            )
         # print(f"Final Info: {info}")
+
+        if evaluator is not None:
+            evaluator.poll()
+            if (episode + 1) % eval_interval == 0:
+                evaluator.submit(greedy, episode + 1)
+
+    return q_table, episode_rewards, epsilon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a Snake Q-learning agent")
+    parser.add_argument(
+        "--policy",
+        metavar="PATH",
+        help="Also save the compiled greedy policy here, for server.py",
+    )
+    args = parser.parse_args()
+
+    # "danger" gives a few hundred binary feature states, "coords" the raw positions
+    obs_mode = "danger"
+    # Board size in pixels and cell size; shrink for quick small-board runs
+    width, height, size = 800, 600, 10
+    # Learn over hashed tiles of the raw observations instead of a Q-table
+    tile_coding = False
+    env = SnakeEnv(
+        render_mode="viewer", obs_mode=obs_mode, width=width, height=height, size=size
+    )
+    # Greedy episodes on snapshots, played in the background while training
+    evaluator = None
+    if AsyncEvaluator.available():
+        evaluator = AsyncEvaluator(
+            partial(SnakeEnv, obs_mode=obs_mode, width=width, height=height, size=size),
+            episodes=10,
+            on_report=lambda result: print(
+                f"Eval after episode {result['step']}: "
+                f"Mean Reward = {result['mean_reward']:.2f}, "
+                f"Mean Steps = {result['mean_steps']:.0f}"
+            ),
+        )
+    q_table = None
+    if tile_coding:
+        q_table = TileQ(TileCoder.from_space(env.observation_space), env.action_space.n)
+    q_table, _, _ = train(
+        env,
+        num_episodes=1_000,
+        alpha=0.1,  # learning rate
+        gamma=0.99,  # discount factor
+        epsilon=1.0,  # exploration rate
+        epsilon_min=0.05,
+        epsilon_decay=0.995,
+        bins=BINS,
+        q_table=q_table,
+        evaluator=evaluator,
+    )
+    if evaluator is not None:
+        evaluator.close()
+
+    # Compile the greedy policy for serving (see server.py)
+    if args.policy and not tile_coding:
+        Policy.from_training(q_table, env, BINS).save(args.policy)
     env.close()
 
 
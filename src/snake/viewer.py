@@ -0,0 +1,80 @@
+import multiprocessing as mp
+import time
+
+import pygame
+
+import paths  # noqa: F401
+from common.slot import SnapshotSlot
+from constants import GREEN, BLACK, WHITE, FPS
+
+# Snapshot layout: [body_length, food_x, food_y, x0, y0, x1, y1, ...]
+HEADER = 3
+
+
+def _run_viewer(slot, width, height, size, fps, title):
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption(title)
+    clock = pygame.time.Clock()
+
+    last_seq = 0
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+
+        latest = slot.read(last_seq)
+        if latest is not None:
+            last_seq, snapshot = latest
+            length, food_x, food_y = snapshot[:HEADER]
+            cells = snapshot[HEADER : HEADER + 2 * length].reshape(-1, 2)
+
+            screen.fill(BLACK)
+            pygame.draw.rect(screen, WHITE, (food_x, food_y, size, size))
+            for x, y in cells:
+                pygame.draw.rect(screen, GREEN, (x, y, size, size))
+            pygame.display.flip()
+
+        clock.tick(fps)
+
+
+class Viewer:
+    """Renders a game in a separate process without slowing down the trainer.
+
+    `publish` only copies a compact snapshot into shared memory (at most `fps`
+    times per second) and never blocks; frames the viewer misses are dropped.
+    """
+
+    def __init__(self, width, height, size, fps=FPS, title="Snake - Viewer"):
+        ctx = mp.get_context("spawn")
+        self.max_cells = (width // size) * (height // size)
+        self.slot = SnapshotSlot(ctx, HEADER + 2 * self.max_cells)
+        self.min_interval = 1 / fps
+        self._last_publish = 0.0
+        self.process = ctx.Process(
+            target=_run_viewer,
+            args=(self.slot, width, height, size, fps, title),
+            daemon=True,
+        )
+        self.process.start()
+
+    def publish(self, game):
+        now = time.perf_counter()
+        if now - self._last_publish < self.min_interval:
+            return
+        self._last_publish = now
+
+        body = game.player.body[: self.max_cells]
+        snapshot = [len(body), game.food.x, game.food.y]
+        for segment in body:
+            snapshot += (segment.x, segment.y)
+        self.slot.publish(snapshot)
+
+    def is_open(self):
+        return self.process.is_alive()
+
+    def close(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
@@ -0,0 +1,46 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+GAMES = ("snake", "pong")
+
+# The code both games share is the `common` package directly under src/
+if str(SRC) not in sys.path:
+    sys.path.append(str(SRC))
+
+# Each game is a directory of flat scripts importing each other by bare name
+# (`from env import ...`), and both games have modules with the same names.
+_MODULES = {path.stem for game in GAMES for path in (SRC / game).glob("*.py")}
+_loaded = None
+
+
+def load_game(game):
+    """Put `game`'s directory on sys.path, dropping the other game's modules.
+
+    Returns:
+        callable: Imports a module of `game` by its bare name
+    """
+    global _loaded
+    if _loaded != game:
+        for name in _MODULES & set(sys.modules):
+            del sys.modules[name]
+        sys.path[:] = [p for p in sys.path if p not in {str(SRC / g) for g in GAMES}]
+        sys.path.insert(0, str(SRC / game))
+        _loaded = game
+    return importlib.import_module
+
+
+@pytest.fixture
+def snake():
+    return load_game("snake")
+
+
+@pytest.fixture
+def pong():
+    return load_game("pong")
@@ -0,0 +1,85 @@
+import io
+import pickle
+import zlib
+
+import numpy as np
+import pytest
+
+
+def _batch(rng, n=8, obs_dim=11):
+    states = rng.integers(0, 2, (n, obs_dim)).astype(np.int8)
+    return (
+        states,
+        rng.integers(0, 4, n).astype(np.int8),
+        rng.normal(size=n).astype(np.float32),
+        np.roll(states, 1, axis=0),
+        np.zeros(n, dtype=bool),
+    )
+
+
+def _reply(distributed, server, kind, version, arrays=()):
+    message = distributed._encode(kind, version, arrays)
+    payload = message[distributed.HEADER.size :]
+    reply = server._reply(kind, 0, version, payload)
+    kind, flags, version, _ = distributed._read_header(reply[: distributed.HEADER.size])
+    count = 2 if kind == distributed.PARAMS else 0
+    return (
+        kind,
+        flags,
+        version,
+        distributed._decode(reply[distributed.HEADER.size :], count),
+    )
+
+
+def test_push_then_delta_pulls(snake):
+    distributed = snake("distributed")
+    server = distributed.ParameterServer(4, history=2)
+    rng = np.random.default_rng(0)
+
+    kind, _, version, _ = _reply(distributed, server, distributed.PUSH, 0, _batch(rng))
+    assert kind == distributed.ACK and version == 1
+
+    # An actor at version 0 gets exactly the states the push updated
+    _, flags, version, (states, q_values) = _reply(
+        distributed, server, distributed.PULL, 0
+    )
+    assert not flags & distributed.FULL and version == 1
+    updated = {tuple(s) for s in _batch(np.random.default_rng(0))[0].tolist()}
+    assert {tuple(s) for s in states.tolist()} == updated
+    for state, q in zip(map(tuple, states.tolist()), q_values):
+        np.testing.assert_allclose(q, server.q_table[state], rtol=1e-6)
+
+    # Nothing changed since version 1
+    _, _, _, (states, _) = _reply(distributed, server, distributed.PULL, 1)
+    assert len(states) == 0
+
+    # Once the history no longer reaches back, the whole table is sent
+    for _ in range(3):
+        _reply(distributed, server, distributed.PUSH, 1, _batch(rng))
+    _, flags, _, (states, _) = _reply(distributed, server, distributed.PULL, 1)
+    assert flags & distributed.FULL and len(states) == len(server.q_table)
+
+
+def test_rejects_pickles_and_bad_batches(snake):
+    distributed = snake("distributed")
+    server = distributed.ParameterServer(4)
+    rng = np.random.default_rng(1)
+
+    # Object arrays would need pickle to load
+    buffer = io.BytesIO()
+    for _ in range(5):
+        np.save(buffer, np.array([{"x": 1}], dtype=object), allow_pickle=True)
+    with pytest.raises(ValueError):
+        server._reply(distributed.PUSH, 0, 0, zlib.compress(buffer.getvalue()))
+
+    states, actions, rewards, next_states, dones = _batch(rng)
+    actions[0] = 9
+    payload = distributed._encode(
+        distributed.PUSH, 0, (states, actions, rewards, next_states, dones)
+    )
+    with pytest.raises(ValueError):
+        server._reply(distributed.PUSH, 0, 0, payload[distributed.HEADER.size :])
+
+    with pytest.raises(ValueError):
+        server._reply(distributed.PUSH, 0, 0, pickle.dumps(_batch(rng)))
+    assert server.transitions == 0
@@ -0,0 +1,51 @@
+import time
+from collections import defaultdict
+from functools import partial
+
+import numpy as np
+import pytest
+
+from common.evaluator import AsyncEvaluator
+
+pytestmark = pytest.mark.skipif(
+    not AsyncEvaluator.available(), reason="AsyncEvaluator needs fork"
+)
+
+
+def _greedy(q_table, obs):
+    return int(np.argmax(q_table[tuple(obs.tolist())]))
+
+
+def test_evaluates_submitted_snapshots(snake):
+    make_env = partial(snake("env").SnakeEnv, obs_mode="danger", width=200, height=200)
+    act = partial(_greedy, defaultdict(partial(np.zeros, 4)))
+
+    evaluator = AsyncEvaluator(make_env, episodes=2)
+    assert evaluator.submit(act, 1)
+    # The only slot is busy with the first snapshot
+    assert not evaluator.submit(act, 2)
+    results = evaluator.close()
+
+    assert [result["step"] for result in results] == [1]
+    assert results[0]["episodes"] == 2
+    assert evaluator.skipped == 1
+
+
+def test_submit_time_does_not_grow_with_table(snake):
+    make_env = partial(snake("env").SnakeEnv, obs_mode="danger", width=200, height=200)
+    rng = np.random.default_rng(0)
+
+    def submit_seconds(n_states):
+        q_table = defaultdict(partial(np.zeros, 4))
+        for state in rng.integers(0, 2**40, n_states).tolist():
+            q_table[state] = rng.normal(size=4)
+        evaluator = AsyncEvaluator(make_env, episodes=1)
+        start = time.perf_counter()
+        assert evaluator.submit(partial(_greedy, q_table), 1)
+        seconds = time.perf_counter() - start
+        evaluator.close()
+        return seconds
+
+    small, large = submit_seconds(1_000), submit_seconds(300_000)
+    # Copying 300k states would take seconds; forking shares them instead
+    assert large < small + 0.25
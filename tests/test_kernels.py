@@ -0,0 +1,145 @@
+import random
+
+import numpy as np
+import pytest
+
+
+def _backends(kernels):
+    backends = [kernels.step_numpy]
+    if kernels.step_numba is not None:
+        backends.append(kernels.step_numba)
+    return backends
+
+
+def _snake_state(env, capacity):
+    player, size = env.game.player, env.size
+    n_cols, n_rows = player.occupancy.shape
+    state = {
+        "body_x": np.zeros((1, capacity), dtype=np.int64),
+        "body_y": np.zeros((1, capacity), dtype=np.int64),
+        "head": np.zeros(1, dtype=np.int64),
+        "length": np.array([len(player.body)]),
+        "direction": np.array(
+            [["up", "down", "left", "right"].index(player.direction)]
+        ),
+        "alive": np.ones(1, dtype=bool),
+        "occupancy": player.occupancy[None].astype(np.int16),
+        "food_x": np.array([env.game.food.x // size]),
+        "food_y": np.array([env.game.food.y // size]),
+    }
+    for k, block in enumerate(player.body):
+        state["body_x"][0, k] = block.x // size
+        state["body_y"][0, k] = block.y // size
+    return state
+
+
+def _body(state):
+    capacity = state["body_x"].shape[1]
+    segments = (state["head"][0] + np.arange(state["length"][0])) % capacity
+    return list(zip(state["body_x"][0, segments], state["body_y"][0, segments]))
+
+
+@pytest.mark.parametrize("backend", [0, 1])
+def test_snake_kernel_matches_env(snake, backend):
+    kernels = snake("kernels")
+    if backend >= len(_backends(kernels)):
+        pytest.skip("Numba is not installed")
+    step = _backends(kernels)[backend]
+    planner = snake("expert").ExpertPlanner()
+    env = snake("env").SnakeEnv(obs_mode="danger", width=120, height=100)
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    n_cols, n_rows = env.width // env.size, env.height // env.size
+
+    env.reset(seed=0)
+    state = _snake_state(env, n_cols * n_rows + 1)
+    eats = deaths = 0
+    for _ in range(2000):
+        action = planner.act(env.game) if rng.random() < 0.9 else rng.integers(4)
+        length = len(env.game.player.body)
+        _, _, terminated, _, _ = env.step(action)
+        ate = step(np.array([action]), rng.random(1), **state)
+
+        assert ate[0] == (len(env.game.player.body) > length)
+        assert state["alive"][0] == env.game.player.is_alive
+        assert state["length"][0] == len(env.game.player.body)
+        if env.game.player.is_alive:
+            cells = [(b.x // env.size, b.y // env.size) for b in env.game.player.body]
+            assert _body(state) == cells
+            np.testing.assert_array_equal(
+                state["occupancy"][0], env.game.player.occupancy
+            )
+
+        if ate[0]:
+            eats += 1
+            # Both respawn the food on a free cell, from different draws
+            fx, fy = state["food_x"][0], state["food_y"][0]
+            assert state["occupancy"][0, fx, fy] == 0
+            assert (
+                env.game.player.occupancy[
+                    env.game.food.x // env.size, env.game.food.y // env.size
+                ]
+                == 0
+            )
+            state["food_x"][0] = env.game.food.x // env.size
+            state["food_y"][0] = env.game.food.y // env.size
+
+        if terminated:
+            deaths += 1
+            env.reset()
+            state = _snake_state(env, n_cols * n_rows + 1)
+    assert eats > 20 and deaths > 0
+
+
+def test_snake_backends_agree(snake):
+    kernels = snake("kernels")
+    if kernels.step_numba is None:
+        pytest.skip("Numba is not installed")
+    kernels.check_parity(n_envs=16, n_steps=300, n_cols=8, n_rows=6)
+
+
+def _pong_state(env):
+    return {
+        "p1_y": np.array([env.player_1.rect.y]),
+        "p2_y": np.array([env.player_2.rect.y]),
+        "ball_x": np.array([env.ball.pos.x]),
+        "ball_y": np.array([env.ball.pos.y]),
+        "dir_x": np.array([env.ball.direction.x]),
+        "dir_y": np.array([env.ball.direction.y]),
+        "first": np.array([env.ball.first_time]),
+    }
+
+
+@pytest.mark.parametrize("backend", [0, 1])
+@pytest.mark.parametrize("two_player", [False, True])
+def test_pong_kernel_matches_env(pong, backend, two_player):
+    kernels = pong("kernels")
+    if backend >= len(_backends(kernels)):
+        pytest.skip("Numba is not installed")
+    step = _backends(kernels)[backend]
+    env = pong("env").PongEnv(two_player=two_player)
+    rng = np.random.default_rng(0)
+
+    env.reset(seed=0)
+    state = _pong_state(env)
+    points = 0
+    for _ in range(2000):
+        actions = rng.integers(0, 3, 2)
+        p2_actions = actions[1:] if two_player else np.array([-1])
+        _, reward, terminated, _, _ = env.step(
+            tuple(actions) if two_player else actions[0]
+        )
+        rewards, point, _ = step(actions[:1], **state, p2_actions=p2_actions)
+
+        np.testing.assert_allclose(
+            rewards[0] if two_player else rewards[0, 0], reward, rtol=1e-12
+        )
+        assert terminated == (point[0] != 0)
+        for key, value in _pong_state(env).items():
+            np.testing.assert_array_equal(state[key], value, err_msg=key)
+
+        if terminated:
+            points += 1
+            env.reset()
+            kernels.reset(point != 0, **state)
+    assert points > 5
@@ -0,0 +1,108 @@
+import random
+
+import numpy as np
+
+
+def _grow(env, cell, length):
+    """Put a straight snake of `length` heading right with its head at `cell`."""
+    player = env.game.player
+    size = env.size
+    player.respawn((cell[0] - length + 1) * size, cell[1] * size)
+    for _ in range(length - 1):
+        player.eat()
+        player.move()
+    assert (player.head.x // size, player.head.y // size) == cell
+
+
+def _occupancy(player, size):
+    expected = np.zeros_like(player.occupancy)
+    for block in player.body:
+        expected[block.x // size, block.y // size] += 1
+    return expected
+
+
+def test_occupancy_tracks_body(snake):
+    random.seed(0)
+    env = snake("env").SnakeEnv(obs_mode="danger", width=200, height=200)
+    env.reset(seed=0)
+    for _ in range(500):
+        _, _, terminated, truncated, _ = env.step(random.randrange(4))
+        if terminated or truncated:
+            env.reset()
+        player = env.game.player
+        if player.is_alive:
+            np.testing.assert_array_equal(
+                player.occupancy, _occupancy(player, env.size)
+            )
+
+
+def test_is_blocked(snake):
+    env = snake("env").SnakeEnv(obs_mode="danger", width=200, height=200)
+    env.reset(seed=0)
+    _grow(env, (5, 5), 3)
+    player = env.game.player
+    n_cols, n_rows = player.occupancy.shape
+
+    assert player.is_blocked(-1, 5) and player.is_blocked(n_cols, 5)
+    assert player.is_blocked(5, -1) and player.is_blocked(5, n_rows)
+    assert player.is_blocked(5, 5) and player.is_blocked(4, 5)
+    # The tail moves away on the next step
+    assert not player.is_blocked(3, 5)
+    assert not player.is_blocked(6, 5)
+
+    # ...unless the snake has just eaten and it stays put
+    player.eat()
+    assert player.is_blocked(3, 5)
+
+
+def test_danger_features(snake):
+    env = snake("env").SnakeEnv(obs_mode="danger", width=200, height=200)
+    env.reset(seed=0)
+    _grow(env, (19, 5), 3)
+    env.game.food.move_to(2 * env.size, 8 * env.size)
+
+    obs = env._get_obs()
+    assert obs.dtype == np.int8 and obs.shape == env.observation_space.shape
+    # Wall straight ahead, free to the left (up) and right (down)
+    assert list(obs[:3]) == [1, 0, 0]
+    # Food is down and to the left
+    assert list(obs[3:7]) == [0, 1, 1, 0]
+    # Heading one-hot in HEADINGS order: up, down, left, right
+    assert list(obs[7:11]) == [0, 0, 0, 1]
+
+
+def test_view_window(snake):
+    env = snake("env").SnakeEnv(obs_mode="danger", view_radius=1, width=200, height=200)
+    env.reset(seed=0)
+    assert env.observation_space.shape == (19,)
+
+    _grow(env, (5, 5), 4)
+    window = env._get_obs()[11:]
+    # Rows run from ahead to behind, columns from left to right; only the
+    # neck (directly behind the head) is blocked
+    assert list(window) == [0, 0, 0, 0, 0, 0, 1, 0]
+
+    # After turning down the window turns with the snake: its right is now
+    # west, where the rest of the body lies
+    env.step(1)
+    window = env._get_obs()[11:]
+    assert list(window) == [0, 0, 0, 0, 0, 0, 1, 1]
+
+
+def test_sparse_policy_matches_q_table(snake):
+    rng = np.random.default_rng(0)
+    env = snake("env").SnakeEnv(obs_mode="danger", view_radius=2)
+    obs_dim = env.observation_space.shape[0]
+    states = {tuple(rng.integers(0, 2, obs_dim)) for _ in range(200)}
+    q_table = {state: rng.normal(size=4) for state in states}
+
+    policy = snake("policy").Policy.from_training(q_table, env)
+    assert policy.keys is not None and policy.actions.size == len(q_table)
+
+    observations = np.array(list(q_table), dtype=np.float32)
+    expected = [np.argmax(q_table[state]) for state in q_table]
+    np.testing.assert_array_equal(policy.act(observations), expected)
+    # States missing from the table act like an all-zero row
+    unseen = np.ones((1, obs_dim), dtype=np.float32)
+    assert tuple(unseen[0].astype(int)) not in q_table
+    assert policy.act(unseen)[0] == 0
@@ -0,0 +1,62 @@
+import pytest
+
+from common.rewards import RewardTerms
+
+
+@pytest.mark.parametrize("weights", [None, {"distance": 2.0, "hit": 0.5}])
+def test_fast_forward_sums_stepped_rewards(pong, weights):
+    env_module = pong("env")
+    rewards = pong("rewards")
+    stepped = env_module.PongEnv(reward_fn=rewards.RewardFunction(weights))
+    skipping = env_module.PongEnv(reward_fn=rewards.RewardFunction(weights))
+    stepped.reset(seed=0)
+    skipping.reset(seed=0)
+
+    _, reward, _, _, info = skipping.fast_forward()
+    assert info["skipped_steps"] > 10
+    total = sum(stepped.step(0)[1] for _ in range(info["skipped_steps"]))
+    assert reward == pytest.approx(total, rel=1e-9)
+    assert skipping.ball.pos == stepped.ball.pos
+    assert skipping.player_2.rect.y == stepped.player_2.rect.y
+
+
+def test_fast_forward_refuses_custom_terms(pong):
+    env_module = pong("env")
+    rewards = pong("rewards")
+
+    @rewards.reward_term("centered")
+    def centered(events):
+        return -abs(events["paddle_center"] - events["height"] / 2)
+
+    try:
+        custom = rewards.RewardFunction({"distance": 1.0, "centered": 0.1})
+        for reward_fn in (custom, lambda events: 0.0):
+            env = env_module.PongEnv(reward_fn=reward_fn)
+            env.reset(seed=0)
+            with pytest.raises(ValueError):
+                env.fast_forward()
+            # Stepping still works with any reward
+            env.step(0)
+    finally:
+        del rewards.REWARD_TERMS["centered"]
+
+
+def test_fast_forward_refuses_other_registries(pong):
+    env_module = pong("env")
+    rewards = pong("rewards")
+    terms = RewardTerms()
+
+    # Same name as a built-in term, but from another registry
+    @terms.register("distance")
+    def distance(events):
+        return 0.0
+
+    class Sparse(rewards.RewardFunction):
+        pass
+
+    Sparse.terms = terms
+    env = env_module.PongEnv(reward_fn=Sparse({"distance": 1.0}))
+    env.reset(seed=0)
+    with pytest.raises(ValueError):
+        env.fast_forward()
+    env.close()
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+
+def test_batch_update_averages_shared_pairs(pong):
+    batch_update = pong("selfplay").batch_update
+    q = np.zeros((4, 3), dtype=np.float32)
+    # 256 identical games move (1, 2) once, like one game would
+    states = np.concatenate([np.full(256, 1), [3, 3]])
+    actions = np.concatenate([np.full(256, 2), [0, 0]])
+    targets = np.concatenate([np.full(256, -0.5), [1.0, 3.0]])
+    batch_update(q, states, actions, targets, 0.1)
+
+    expected = np.zeros((4, 3))
+    expected[1, 2] = 0.1 * -0.5
+    expected[3, 0] = 0.1 * 2.0
+    np.testing.assert_allclose(q, expected, rtol=1e-6)
+
+
+def test_identical_games_learn_like_one(pong):
+    selfplay = pong("selfplay")
+
+    def learn(n_envs):
+        # No exploration and a fixed opponent keep every game identical
+        policy, _, finished = selfplay.train(
+            n_envs=n_envs,
+            steps=1000,
+            epsilon=0.0,
+            epsilon_min=0.0,
+            snapshot_interval=10**6,
+            league=selfplay.League(scripted=False),
+            verbose=False,
+        )
+        return policy, finished
+
+    one, finished_one = learn(1)
+    batch, finished_batch = learn(64)
+    np.testing.assert_array_equal(batch.actions, one.actions)
+    assert finished_batch == pytest.approx(np.repeat(finished_one, 64).tolist())
@@ -0,0 +1,69 @@
+import asyncio
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+
+def _policy(rng, obs_dim=3):
+    from common.policy import Policy
+
+    edges = [np.linspace(0, 1, 4)] * obs_dim
+    actions = rng.integers(0, 4, size=[5] * obs_dim).astype(np.uint8)
+    return Policy(
+        obs_dim, range(obs_dim), edges, [0] * obs_dim, [False] * obs_dim, actions
+    )
+
+
+@pytest.fixture
+def serve(snake):
+    # The game's paths module puts src/ on sys.path for `common`
+    snake("paths")
+    from common.server import BatchingServer
+
+    def start(policy, max_batch=4096):
+        sock = socket.create_server(("127.0.0.1", 0))
+        server = BatchingServer(policy, max_batch=max_batch)
+        threading.Thread(
+            target=asyncio.run, args=(server.serve(sock=sock),), daemon=True
+        ).start()
+        return sock.getsockname()[1]
+
+    return start
+
+
+@pytest.mark.parametrize("max_batch", [1, 4096])
+def test_round_trip(serve, max_batch):
+    from common.server import PolicyClient
+
+    rng = np.random.default_rng(0)
+    policy = _policy(rng)
+    port = serve(policy, max_batch=max_batch)
+
+    clients = [PolicyClient(policy.obs_dim, port=port) for _ in range(3)]
+    for size in (1, 7, 100):
+        for client in clients:
+            observations = rng.uniform(-0.2, 1.2, (size, policy.obs_dim))
+            np.testing.assert_array_equal(
+                client.act(observations), policy.act(observations)
+            )
+    for client in clients:
+        client.close()
+
+
+def test_disconnect_keeps_serving(serve):
+    from common.server import PolicyClient
+
+    rng = np.random.default_rng(1)
+    policy = _policy(rng)
+    port = serve(policy)
+
+    # A client that leaves mid-request must not take the server down
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.sendall(b"\x00\x00\x00\x05")
+
+    client = PolicyClient(policy.obs_dim, port=port)
+    observations = rng.uniform(0, 1, (10, policy.obs_dim))
+    np.testing.assert_array_equal(client.act(observations), policy.act(observations))
+    client.close()
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from common.tiles import TileCoder, TileQ
+
+
+@pytest.fixture
+def coder():
+    return TileCoder([0, 0, -1], [10, 10, 1], tiles_per_dim=4, n_tilings=8)
+
+
+def test_active_shape_range_and_determinism(coder):
+    rng = np.random.default_rng(0)
+    observations = rng.uniform([0, 0, -1], [10, 10, 1], (500, 3))
+    slots = coder.active(observations)
+    assert slots.shape == (500, 8) and slots.dtype == np.int64
+    assert slots.min() >= 0 and slots.max() < coder.memory_size
+    np.testing.assert_array_equal(slots, coder.active(observations))
+    # A single observation is a batch of one
+    np.testing.assert_array_equal(coder.active(observations[0]), slots[:1])
+    # Same seed, same hash
+    again = TileCoder([0, 0, -1], [10, 10, 1], tiles_per_dim=4, n_tilings=8)
+    np.testing.assert_array_equal(again.active(observations), slots)
+
+
+def test_nearby_observations_share_tiles(coder):
+    rng = np.random.default_rng(1)
+    observations = rng.uniform([0, 0, -1], [10, 10, 1], (200, 3))
+    # A tile is 2.5 wide in x, so a 0.1 nudge changes at most a few tilings
+    nudged = observations + [0.1, 0, 0]
+    far = observations + [5, 5, 0]
+    shared_near = (coder.active(observations) == coder.active(nudged)).mean()
+    shared_far = (coder.active(observations) == coder.active(far)).mean()
+    assert shared_near > 0.8
+    assert shared_far < 0.05
+
+
+def test_tilings_and_seeds_hash_apart(coder):
+    observation = np.array([5.0, 5.0, 0.0])
+    # Each tiling lands in its own slot
+    assert len(set(coder.active(observation)[0])) == coder.n_tilings
+
+    other = TileCoder([0, 0, -1], [10, 10, 1], tiles_per_dim=4, n_tilings=8, seed=1)
+    assert not np.array_equal(coder.active(observation), other.active(observation))
+
+
+def test_tile_q_update_moves_towards_target(coder):
+    q = TileQ(coder, n_actions=3)
+    observation = np.array([2.0, 7.0, 0.5])
+    for _ in range(50):
+        q.update(observation, 1, 4.0, alpha=0.5)
+    np.testing.assert_allclose(q[observation], [0, 4, 0], atol=1e-4)
+    # Unrelated observations share no tiles and keep their values
+    np.testing.assert_allclose(q[np.array([9.0, 1.0, -0.9])], 0)
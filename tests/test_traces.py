@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from common.traces import ArrayQTable, EligibilityTraces, NStepWindow
+
+# A five-state chain walked once with action 0, rewarded 1 on the last step
+CHAIN = [(k,) for k in range(5)]
+GAMMA, LAM, ALPHA = 0.9, 0.9, 0.5
+
+
+def test_n_step_targets():
+    window = NStepWindow(3, GAMMA)
+    for state, reward in zip("abc", (1.0, 2.0, 3.0)):
+        window.append(state, 0, reward)
+    # 1 + 0.9 * 2 + 0.81 * 3 + 0.729 * 10
+    [(state, _, target)] = window.targets(10.0)
+    assert state == "a" and target == pytest.approx(12.52)
+
+    window.append("d", 0, 4.0)
+    # 2 + 0.9 * 3 + 0.81 * 4 + 0.729 * 5
+    [(state, _, target)] = window.targets(5.0)
+    assert state == "b" and target == pytest.approx(11.585)
+
+    # The episode ends: shorter returns for the rest, bootstrapped from 0
+    popped = window.targets(0.0, flush=True)
+    assert [(s, pytest.approx(t)) for s, _, t in popped] == [("c", 6.6), ("d", 4.0)]
+    assert not window.targets(0.0, flush=True)
+
+
+def test_watkins_traces():
+    table = ArrayQTable(2)
+    traces = EligibilityTraces()
+    for k, state in enumerate(CHAIN):
+        reward = 1.0 if k == len(CHAIN) - 1 else 0.0
+        traces.visit(table.state_id(state), 0)
+        traces.update(table.q, ALPHA * reward)
+        traces.decay(GAMMA * LAM)
+    # Only the last TD error is non-zero, and reaches state k through a trace
+    # decayed by (gamma * lam) ** (4 - k)
+    for k, state in enumerate(CHAIN):
+        assert table[state][0] == pytest.approx(ALPHA * 0.81 ** (4 - k))
+        assert table[state][1] == 0
+
+
+def test_traces_replace_and_drop_below_threshold():
+    traces = EligibilityTraces(threshold=0.5, capacity=1)
+    traces.visit(3, 1)
+    traces.visit(4, 0)
+    traces.decay(0.6)
+    traces.visit(3, 1)
+    # Revisiting replaces the trace instead of adding to it
+    assert len(traces) == 2
+    np.testing.assert_allclose(sorted(traces.traces[:2]), [0.6, 1.0])
+    traces.decay(0.6)
+    assert len(traces) == 1 and traces.state_ids[0] == 3
+
+
+def test_array_q_table_behaves_like_a_dict():
+    table = ArrayQTable(3, capacity=2)
+    table[("a",)][1] += 2.0
+    for k in range(5):
+        table[(k,)]
+    assert len(table) == 6 and ("a",) in table
+    assert table[("a",)][1] == 2.0
+    copy = ArrayQTable.from_dict(dict(table.items()), 3)
+    np.testing.assert_array_equal(copy[("a",)], [0, 2, 0])
+
+
+@pytest.mark.parametrize(
+    "update_mode, expected",
+    [
+        # n-step (n=3): the first two states only bootstrap from zeros, the
+        # rest get the flushed returns 0.81, 0.9 and 1
+        ("n_step", [0, 0, 0.81, 0.9, 1.0]),
+        ("watkins", [0.81**4, 0.81**3, 0.81**2, 0.81, 1.0]),
+    ],
+)
+def test_agent_multi_step_updates(pong, update_mode, expected):
+    agent = pong("train").SimpleQAgent(
+        2,
+        learning_rate=ALPHA,
+        discount=GAMMA,
+        update_mode=update_mode,
+        n_step=3,
+        lam=LAM,
+    )
+    for k, state in enumerate(CHAIN):
+        last = k == len(CHAIN) - 1
+        next_state = ("end",) if last else CHAIN[k + 1]
+        agent.update(state, 0, 1.0 if last else 0.0, next_state, done=last)
+    values = [agent.q_table[state][0] for state in CHAIN]
+    np.testing.assert_allclose(values, ALPHA * np.array(expected))
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("dir_x", [-1.0, 1.0])
+def test_predict_intercept_matches_stepped_env(pong, dir_x):
+    env = pong("env").PongEnv(two_player=True)
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        env.reset()
+        env.ball.pos.update(rng.uniform(200, 700), rng.uniform(10, env.height - 10))
+        env.ball.direction.update(dir_x, rng.choice([-1.0, 1.0]))
+        # A full-height right paddle always returns the ball, as assumed
+        env.player_2.rect.y = 0
+        env.player_2.rect.height = env.height
+        predicted = env.predict_intercept()
+
+        for _ in range(1000):
+            env.step((0, 0))
+            if int(env.ball.pos.x - env.ball.radius) < env.player_1.rect.right:
+                break
+        assert env.ball.pos.y == pytest.approx(predicted)
+    env.close()